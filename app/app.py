@@ -590,7 +590,7 @@ def search_by_text_tab(per_page, max_pages, top_n, debug_query=False, abstract_k
                         st.session_state.top_works = None
                     else:
                         # Calcular scores
-                        df_ranked = calculate_scores(df_candidates)
+                        df_ranked = calculate_scores(df_candidates, top_n=top_n)
                         
                         # Obtener top N
                         df_top = get_top_recommendations(df_ranked, top_n=top_n)
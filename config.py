@@ -14,10 +14,26 @@ MYSQL_PORT = int(os.getenv('MYSQL_PORT', 3306))
 MYSQL_DB = os.getenv('MYSQL_DB', 'journal_intelligence')
 MYSQL_USER = os.getenv('MYSQL_USER', 'root')
 MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', '')
+DB_POOL_SIZE = 10  # Conexiones persistentes en el pool de SQLAlchemy
+DB_MAX_OVERFLOW = 20  # Conexiones extra temporales por encima del pool
+DB_POOL_RECYCLE = 1800  # Segundos antes de reciclar una conexión del pool
 
 # Configuración OpenAlex
 OPENALEX_EMAIL = os.getenv('OPENALEX_EMAIL', '')
 OPENALEX_BASE_URL = 'https://api.openalex.org'
+DEBUG_HTTP = os.getenv('DEBUG_HTTP', '').lower() in ('1', 'true', 'yes')  # Log de URLs de OpenAlex
+OPENALEX_MAX_WORKERS = 16  # Peticiones concurrentes máximas a OpenAlex
+OPENALEX_POOL_SIZE = 32  # Conexiones keep-alive reutilizables por host
+OPENALEX_MAX_429_RETRIES = 3  # Reintentos respetando Retry-After ante HTTP 429
+OPENALEX_MAX_RETRY_AFTER = 60  # Espera máxima (segundos) aceptada desde Retry-After
+OPENALEX_FILTER_BATCH_SIZE = 50  # IDs por request al filtrar varios sources a la vez
+OPENALEX_SOURCE_CACHE_SIZE = 4096  # Sources guardados en memoria (LRU) por proceso
+# Caché en disco (SQLite) de /sources; vacío para desactivarla
+OPENALEX_HTTP_CACHE = os.getenv(
+    'OPENALEX_HTTP_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'openalex_cache')
+)
+OPENALEX_HTTP_CACHE_EXPIRE = 86400  # Segundos de validez de la caché de sources (disco y memoria)
 
 # String de conexión MySQL
 MYSQL_CONNECTION_STRING = (
@@ -29,4 +45,16 @@ MYSQL_CONNECTION_STRING = (
 DEFAULT_PER_PAGE = 200
 DEFAULT_MAX_PAGES = 2
 TOP_SOURCES_LIMIT = 30  # Número máximo de sources a enriquecer con llamadas API completas
+SOURCES_REFRESH_DAYS = 7  # Sources actualizados hace menos días no se vuelven a pedir a OpenAlex
 TOP_N_RECOMMENDATIONS = 10
+# Caché en disco de la matriz de similitud entre revistas; vacío para desactivarla
+SIMILARITY_CACHE_DIR = os.getenv(
+    'SIMILARITY_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'similarity_cache')
+)
+SIMILARITY_CACHE_KEY_TTL = 300  # Segundos que se reutiliza la clave de validez de la caché de similitud
+SOURCES_CACHE_TTL = 3600  # Segundos que el ranker reutiliza en memoria las filas de sources
+SOURCES_CACHE_SIZE = 100_000  # Máximo de filas de sources en la caché del ranker
+DB_BATCH_SIZE = 1000  # Filas por sentencia en escrituras batch a MySQL
+DB_STREAM_BATCH_SIZE = 500  # Filas por lote al leer consultas grandes en streaming
+WORK_QUEUE_SIZE = 1024  # Capacidad de la cola productor/consumidor (backpressure)
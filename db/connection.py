@@ -5,16 +5,24 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.exc import OperationalError
 import sys
 import os
+import threading
 
 # Agregar el directorio raíz al path para importar config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import config
 
+# Engine compartido por proceso: el pool de conexiones se reutiliza entre llamadas
+_engine = None
+_engine_lock = threading.Lock()
+
 
 def get_engine():
     """
-    Crea y retorna un engine de SQLAlchemy para MySQL.
+    Retorna el engine de SQLAlchemy para MySQL, creándolo la primera vez.
+    
+    El engine (y su pool de conexiones) se crea una sola vez por proceso y se
+    reutiliza en todas las llamadas; la conexión solo se prueba al crearlo.
     
     Returns:
         sqlalchemy.engine.Engine: Engine configurado para MySQL
@@ -22,19 +30,29 @@ def get_engine():
     Raises:
         OperationalError: Si no se puede conectar a MySQL
     """
+    global _engine
+    if _engine is not None:
+        return _engine
+    
     try:
-        engine = create_engine(
-            config.MYSQL_CONNECTION_STRING,
-            echo=False,  # Cambiar a True para debug SQL
-            pool_pre_ping=True,  # Verifica conexión antes de usar
-            pool_recycle=3600  # Recicla conexiones cada hora
-        )
-        
-        # Probar la conexión
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    config.MYSQL_CONNECTION_STRING,
+                    echo=False,  # Cambiar a True para debug SQL
+                    pool_size=config.DB_POOL_SIZE,
+                    max_overflow=config.DB_MAX_OVERFLOW,
+                    pool_pre_ping=True,  # Verifica conexión antes de usar
+                    pool_recycle=config.DB_POOL_RECYCLE  # Recicla conexiones periódicamente
+                )
+                
+                # Probar la conexión
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                
+                _engine = engine
         
-        return engine
+        return _engine
         
     except OperationalError as e:
         print(f"❌ Error al conectar a MySQL:")
@@ -46,6 +46,38 @@ def create_database():
         return False
 
 
+def ensure_fulltext_index(cursor):
+    """
+    Añade el índice FULLTEXT de sources.display_name en bases de datos creadas
+    antes de que existiera en schema.sql (CREATE TABLE IF NOT EXISTS no lo añade).
+    """
+    cursor.execute(
+        "SELECT COUNT(*) AS n FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = 'sources' "
+        "AND index_name = 'ft_display_name'"
+    )
+    if cursor.fetchone()['n'] == 0:
+        print("🔧 Añadiendo índice FULLTEXT ft_display_name a sources...")
+        cursor.execute("ALTER TABLE sources ADD FULLTEXT KEY ft_display_name (display_name)")
+
+
+def ensure_openalex_updated_date_column(cursor):
+    """
+    Añade sources.openalex_updated_date en bases de datos creadas antes de que
+    existiera en schema.sql (CREATE TABLE IF NOT EXISTS no la añade).
+    """
+    cursor.execute(
+        "SELECT COUNT(*) AS n FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = 'sources' "
+        "AND column_name = 'openalex_updated_date'"
+    )
+    if cursor.fetchone()['n'] == 0:
+        print("🔧 Añadiendo columna openalex_updated_date a sources...")
+        cursor.execute(
+            "ALTER TABLE sources ADD COLUMN openalex_updated_date DATETIME(6) NULL AFTER updated_date"
+        )
+
+
 def execute_schema():
     """
     Ejecuta el archivo schema.sql para crear las tablas.
@@ -74,6 +106,8 @@ def execute_schema():
             for statement in statements:
                 if statement:
                     cursor.execute(statement)
+            ensure_fulltext_index(cursor)
+            ensure_openalex_updated_date_column(cursor)
             connection.commit()
         
         print("✅ Tablas creadas/verificadas:")
@@ -12,11 +12,13 @@ CREATE TABLE IF NOT EXISTS sources (
     works_count INT DEFAULT 0,
     cited_by_count INT DEFAULT 0,
     updated_date DATETIME,
+    openalex_updated_date DATETIME(6) NULL,  -- updated_date de OpenAlex del último intento de completar métricas
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_display_name (display_name),
     INDEX idx_works_count (works_count),
-    INDEX idx_cited_by_count (cited_by_count)
+    INDEX idx_cited_by_count (cited_by_count),
+    FULLTEXT KEY ft_display_name (display_name)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Tabla de trabajos/artículos (works_sample)
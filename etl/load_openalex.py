@@ -2,21 +2,30 @@
 Pipeline ETL para cargar datos de OpenAlex a MySQL.
 """
 import pandas as pd
-from datetime import datetime
+import numpy as np
+from datetime import datetime, timedelta
 from collections import Counter
 import sys
 import os
 import json
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 
 # Agregar el directorio raíz al path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from etl.openalex_client import search_works_by_text, get_source
 from db.connection import get_engine
+from ml.ranker import invalidate_sources
 import config
 
 
+# Campos de OpenAlex usados para enriquecer la tabla sources
+SOURCE_FIELDS = (
+    'id,display_name,issn_l,country_code,host_organization_name,type,'
+    'works_count,cited_by_count,counts_by_year,summary_stats,topics,topic_share'
+)
+
+
 def extract_source_info(work):
     """
     Extrae información de la fuente (source) de un work.
@@ -47,6 +56,134 @@ def extract_source_info(work):
     return None, None
 
 
+def get_fresh_sources(engine, source_ids):
+    """
+    Obtiene los sources que ya existen en MySQL con datos recientes.
+    
+    Args:
+        engine: SQLAlchemy engine
+        source_ids (list): IDs de sources a comprobar
+        
+    Returns:
+        dict: {source_id: display_name} de los sources actualizados en los
+              últimos config.SOURCES_REFRESH_DAYS días
+    """
+    if not source_ids:
+        return {}
+    
+    query = text("""
+    SELECT source_id, display_name
+    FROM sources
+    WHERE source_id IN :ids
+      AND updated_date >= :since
+    """).bindparams(bindparam('ids', expanding=True))
+    
+    # updated_date se guarda en UTC (ver build_source_row): se compara con el
+    # mismo reloj y no con NOW() de MySQL
+    since = datetime.utcnow() - timedelta(days=config.SOURCES_REFRESH_DAYS)
+    
+    with engine.connect() as conn:
+        result = conn.execute(query, {'ids': list(source_ids), 'since': since})
+        return {row.source_id: row.display_name or '' for row in result}
+
+
+def build_source_row(source_data, ref_year, source_id=None):
+    """
+    Convierte un source de OpenAlex en una fila de la tabla sources.
+    
+    Args:
+        source_data (dict): Datos del source desde OpenAlex
+        ref_year (int): Año de referencia para works/cites_ref_year
+        source_id (str, optional): ID ya conocido; por defecto se extrae de source_data['id']
+        
+    Returns:
+        dict: Fila con las columnas de sources (ver upsert_sources), o None si no tiene ID
+    """
+    source_id = source_id or (source_data.get('id') or '').rpartition('/')[2]
+    if not source_id:
+        return None
+    
+    # Buscar datos del año de referencia en counts_by_year
+    works_ref_year = 0  # Default 0 en lugar de None
+    cites_ref_year = 0  # Default 0 en lugar de None
+    for year_entry in source_data.get('counts_by_year', []):
+        if year_entry.get('year') == ref_year:
+            works_ref_year = year_entry.get('works_count', 0) or 0
+            cites_ref_year = year_entry.get('cited_by_count', 0) or 0
+            break
+    
+    # Extraer two_yr_mean_citedness
+    summary_stats = source_data.get('summary_stats') or {}
+    two_yr_mean_citedness = summary_stats.get('2yr_mean_citedness')
+    
+    # Extraer topics para similitud temática
+    topics = source_data.get("topics", []) or source_data.get("topic_share", []) or []
+    topics_json = json.dumps(topics) if topics else None
+    
+    return {
+        'source_id': source_id,
+        'display_name': source_data.get('display_name', ''),
+        'issn_l': source_data.get('issn_l', None),
+        'country_code': source_data.get('country_code', None),
+        'publisher': source_data.get('host_organization_name', None),
+        'type': source_data.get('type', None),
+        'works_count': source_data.get('works_count', 0),
+        'cited_by_count': source_data.get('cited_by_count', 0),
+        'ref_year': ref_year,
+        'two_yr_mean_citedness': two_yr_mean_citedness,
+        'works_ref_year': works_ref_year,
+        'cites_ref_year': cites_ref_year,
+        'topics_json': topics_json,
+        'updated_date': datetime.utcnow()
+    }
+
+
+def upsert_sources(engine, source_rows):
+    """
+    Inserta o actualiza sources en MySQL en una sola transacción.
+    
+    Usa INSERT ... ON DUPLICATE KEY UPDATE, que cubre tanto los sources nuevos
+    como los existentes sin un UPDATE de respaldo por fila.
+    
+    Args:
+        engine: SQLAlchemy engine
+        source_rows (list): Diccionarios con las columnas de sources
+    """
+    upsert_sql = text("""
+    INSERT INTO sources (
+        source_id, display_name, issn_l, country_code, publisher, type,
+        works_count, cited_by_count, ref_year, two_yr_mean_citedness,
+        works_ref_year, cites_ref_year, topics_json, updated_date
+    )
+    VALUES (
+        :source_id, :display_name, :issn_l, :country_code, :publisher, :type,
+        :works_count, :cited_by_count, :ref_year, :two_yr_mean_citedness,
+        :works_ref_year, :cites_ref_year, :topics_json, :updated_date
+    )
+    ON DUPLICATE KEY UPDATE
+        display_name = VALUES(display_name),
+        issn_l = VALUES(issn_l),
+        country_code = VALUES(country_code),
+        publisher = VALUES(publisher),
+        type = VALUES(type),
+        works_count = VALUES(works_count),
+        cited_by_count = VALUES(cited_by_count),
+        ref_year = VALUES(ref_year),
+        two_yr_mean_citedness = VALUES(two_yr_mean_citedness),
+        works_ref_year = VALUES(works_ref_year),
+        cites_ref_year = VALUES(cites_ref_year),
+        topics_json = VALUES(topics_json),
+        updated_date = VALUES(updated_date)
+    """)
+    
+    with engine.begin() as conn:
+        for start in range(0, len(source_rows), config.DB_BATCH_SIZE):
+            conn.execute(upsert_sql, source_rows[start:start + config.DB_BATCH_SIZE])
+    
+    # El ranker no debe puntuar con las filas anteriores a este upsert
+    invalidate_sources(row['source_id'] for row in source_rows)
+
+
 def load_works_and_sources(query_text, per_page=None, max_pages=None, search_mode="title_abstract", top_sources_limit=None):
     """
     Pipeline completo: descarga works, extrae sources, upsert a MySQL.
@@ -126,109 +263,40 @@ def load_works_and_sources(query_text, per_page=None, max_pages=None, search_mod
     print(f"  Enriqueciendo solo los top {len(top_sources)} sources por frecuencia (de {len(source_counts)} totales)")
     print(f"  Esto acelera el proceso evitando llamadas API innecesarias.\n")
     
+    # Sources ya presentes en MySQL y actualizados recientemente: no volver a pedirlos
+    fresh_sources = get_fresh_sources(engine, [source_id for source_id, _ in top_sources])
+    source_display_name_map.update(fresh_sources)
+    if fresh_sources:
+        print(f"  {len(fresh_sources)} sources ya actualizados en los últimos {config.SOURCES_REFRESH_DAYS} días (se omiten)\n")
+    
+    # Calcular año de referencia (4 años atrás)
+    ref_year = datetime.utcnow().year - 4
+    source_rows = []
+    
     for source_id, freq in top_sources:
+        if source_id in fresh_sources:
+            continue
+        
         try:
             # Obtener info completa de OpenAlex
-            source_data = get_source(source_id)
+            source_data = get_source(source_id, select=SOURCE_FIELDS)
             source_display_name_map[source_id] = source_data.get('display_name', '') if source_data else ''
             if not source_data:
                 continue
             
-            # Calcular año de referencia (4 años atrás)
-            ref_year = datetime.utcnow().year - 4
-            
-            # Buscar datos del año de referencia en counts_by_year
-            ref_year_data = None
-            works_ref_year = 0  # Default 0 en lugar de None
-            cites_ref_year = 0  # Default 0 en lugar de None
-            for year_entry in source_data.get('counts_by_year', []):
-                if year_entry.get('year') == ref_year:
-                    ref_year_data = year_entry
-                    works_ref_year = year_entry.get('works_count', 0) or 0
-                    cites_ref_year = year_entry.get('cited_by_count', 0) or 0
-                    break
-            
-            # Extraer two_yr_mean_citedness
-            summary_stats = source_data.get('summary_stats') or {}
-            two_yr_mean_citedness = summary_stats.get('2yr_mean_citedness')
-            
-            # Extraer topics para similitud temática (preparación)
-            topics = source_data.get("topics", []) or source_data.get("topic_share", []) or []
-            topics_json = json.dumps(topics) if topics else None
-            
             # Preparar datos para MySQL
-            source_row = {
-                'source_id': source_id,
-                'display_name': source_data.get('display_name', ''),
-                'issn_l': source_data.get('issn_l', None),
-                'country_code': source_data.get('country_code', None),
-                'publisher': source_data.get('host_organization_name', None),
-                'type': source_data.get('type', None),
-                'works_count': source_data.get('works_count', 0),
-                'cited_by_count': source_data.get('cited_by_count', 0),
-                'ref_year': ref_year,
-                'two_yr_mean_citedness': two_yr_mean_citedness,
-                'works_ref_year': works_ref_year,
-                'cites_ref_year': cites_ref_year,
-                'topics_json': topics_json,
-                'updated_date': datetime.utcnow()
-            }
-            
-            # UPSERT: insertar o actualizar si existe
-            df_source = pd.DataFrame([source_row])
-            df_source.to_sql(
-                'sources',
-                engine,
-                if_exists='append',
-                index=False,
-                method='multi'
-            )
-            sources_updated += 1
+            source_rows.append(build_source_row(source_data, ref_year, source_id))
             
         except Exception as e:
-            # Si falla por duplicado, intentar update completo
-            if source_data:  # Evitar error si source_data es None
-                try:
-                    # UPDATE parametrizado con TODAS las columnas
-                    with engine.begin() as conn:
-                        update_sql = text("""
-                        UPDATE sources SET
-                            display_name = :display_name,
-                            issn_l = :issn_l,
-                            country_code = :country_code,
-                            publisher = :publisher,
-                            type = :type_val,
-                            works_count = :works_count,
-                            cited_by_count = :cited_by_count,
-                            ref_year = :ref_year,
-                            works_ref_year = :works_ref_year,
-                            cites_ref_year = :cites_ref_year,
-                            two_yr_mean_citedness = :two_yr_mean_citedness,
-                            topics_json = :topics_json,
-                            updated_date = NOW()
-                        WHERE source_id = :source_id
-                        """)
-                        
-                        conn.execute(update_sql, {
-                            'display_name': source_data.get('display_name', ''),
-                            'issn_l': source_data.get('issn_l', None),
-                            'country_code': source_data.get('country_code', None),
-                            'publisher': source_data.get('host_organization_name', None),
-                            'type_val': source_data.get('type', None),
-                            'works_count': source_data.get('works_count', 0),
-                            'cited_by_count': source_data.get('cited_by_count', 0),
-                            'ref_year': ref_year,
-                            'works_ref_year': works_ref_year,
-                            'cites_ref_year': cites_ref_year,
-                            'two_yr_mean_citedness': two_yr_mean_citedness,
-                            'topics_json': topics_json,
-                            'source_id': source_id
-                        })
-                        sources_updated += 1
-                except Exception as e2:
-                    print(f"  ⚠️  No se pudo actualizar source {source_id}: {e2}")
-            else:
-                print(f"  ⚠️  source_data es None para {source_id}, no se puede actualizar")
+            print(f"  ⚠️  No se pudo procesar source {source_id}: {e}")
+    
+    # UPSERT de todos los sources en una única transacción
+    if source_rows:
+        try:
+            upsert_sources(engine, source_rows)
+            sources_updated = len(source_rows)
+        except Exception as e:
+            print(f"  ⚠️  No se pudieron guardar los sources en MySQL: {e}")
     
     # Para sources no enriquecidos, usar display_name de source_names_map
     for source_id in source_counts.keys():
@@ -236,7 +304,8 @@ def load_works_and_sources(query_text, per_page=None, max_pages=None, search_mod
             source_display_name_map[source_id] = source_names_map.get(source_id, '') or source_id
     
     print(f"✅ {sources_updated} sources enriquecidos con llamadas API completas")
-    print(f"   {len(source_counts) - sources_updated} sources adicionales usan display_name básico")
+    print(f"   {len(fresh_sources)} sources reutilizados desde MySQL")
+    print(f"   {len(source_counts) - sources_updated - len(fresh_sources)} sources adicionales usan display_name básico")
     print()
     
     # Paso 4: Insertar works_sample y preparar DataFrame de works
@@ -321,15 +390,20 @@ def load_works_and_sources(query_text, per_page=None, max_pages=None, search_mod
         # MODO FULLTEXT: Score mixto 70% relevancia + 30% citas
         print("  Ordenando por score mixto (70% relevancia + 30% citas)")
         
-        # Normalizar relevance_score y cited_by_count
-        max_rel = df_works_top['relevance_score'].max()
-        max_cites = df_works_top['cited_by_count'].max()
-        
-        df_works_top['rel_norm'] = df_works_top['relevance_score'] / max_rel if max_rel > 0 else 0
-        df_works_top['cites_norm'] = df_works_top['cited_by_count'] / max_cites if max_cites > 0 else 0
+        # Normalizar relevance_score y cited_by_count sobre arrays temporales
+        # (sin columnas intermedias rel_norm/cites_norm en el DataFrame)
+        rel = np.nan_to_num(df_works_top['relevance_score'].to_numpy(np.float64))
+        cites = np.nan_to_num(df_works_top['cited_by_count'].to_numpy(np.float64))
+        max_rel = rel.max() if len(rel) else 0
+        max_cites = cites.max() if len(cites) else 0
         
         # Score mixto
-        df_works_top['work_score'] = 0.7 * df_works_top['rel_norm'].fillna(0) + 0.3 * df_works_top['cites_norm'].fillna(0)
+        work_score = np.zeros(len(df_works_top))
+        if max_rel > 0:
+            work_score += (0.7 / max_rel) * rel
+        if max_cites > 0:
+            work_score += (0.3 / max_cites) * cites
+        df_works_top['work_score'] = work_score
         
         # Ordenar por work_score DESC
         df_works_top = df_works_top.sort_values('work_score', ascending=False)
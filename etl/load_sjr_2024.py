@@ -48,9 +48,16 @@ def explode_issn_field(df):
     """
     records = []
     
-    for _, row in df.iterrows():
-        issn_field = row.get('Issn', '')
-        
+    # Columnas como listas nativas (sin construir una Series por fila)
+    def column_values(name, default):
+        return df[name].tolist() if name in df.columns else [default] * len(df)
+    
+    for issn_field, title, sjr, quartile in zip(
+        column_values('Issn', ''),
+        column_values('Title', ''),
+        column_values('SJR', None),
+        column_values('SJR Best Quartile', None)
+    ):
         if pd.isna(issn_field) or not issn_field:
             continue
         
@@ -64,9 +71,9 @@ def explode_issn_field(df):
                 # Crear registro con ISSN normalizado
                 record = {
                     'issn_norm': issn_norm,
-                    'title': row.get('Title', ''),
-                    'sjr': row.get('SJR', None),
-                    'quartile': row.get('SJR Best Quartile', None)
+                    'title': title,
+                    'sjr': sjr,
+                    'quartile': quartile
                 }
                 records.append(record)
     
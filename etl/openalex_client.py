@@ -2,7 +2,18 @@
 Cliente para interactuar con la API de OpenAlex.
 Incluye manejo de errores y reintentos con backoff.
 """
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import backoff
 import sys
 import os
@@ -13,9 +24,152 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
 
 
+__all__ = [
+    'OpenAlexClient', 'search_works_by_text', 'get_source', 'search_sources',
+    'get_source_by_issn', 'parse_openalex_date'
+]
+
+logger = logging.getLogger(__name__)
+
+# Bigramas fuertes conocidos (frases que deben ir juntas en modo fulltext)
+STRONG_BIGRAMS = frozenset([
+    ('editorial', 'board'),
+    ('machine', 'learning'),
+    ('artificial', 'intelligence'),
+    ('climate', 'change'),
+    ('deep', 'learning'),
+    ('neural', 'network'),
+    ('systematic', 'review'),
+    ('meta', 'analysis'),
+    ('randomized', 'controlled'),
+    ('double', 'blind')
+])
+
+# Términos genéricos a filtrar del OR-group
+GENERIC_TERMS = frozenset({
+    'scholarly', 'journal', 'study', 'research', 'analysis',
+    'paper', 'review', 'article', 'publication', 'science',
+    'scientific', 'academic', 'data', 'results', 'method',
+    'approach', 'using', 'based', 'new', 'model'
+})
+
+
+def _retry_after_seconds(response):
+    """
+    Lee la cabecera Retry-After de una respuesta.
+    
+    Args:
+        response (requests.Response): Respuesta HTTP (normalmente 429)
+        
+    Returns:
+        float: Segundos a esperar, o None si la cabecera falta o no es válida
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    
+    # Formato 1: número de segundos
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    # Formato 2: fecha HTTP
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# OpenAlex solo permite paginar con page= los primeros 10.000 resultados;
+# más allá hay que usar cursor=
+MAX_PAGED_RESULTS = 10000
+
+# Códigos HTTP transitorios que merece la pena reintentar
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_openalex_date(value):
+    """
+    Convierte un updated_date de OpenAlex (ISO 8601, UTC) en datetime.
+    
+    Args:
+        value (str): Fecha tal como la devuelve la API (ej: '2024-05-01T06:12:34.123456')
+        
+    Returns:
+        datetime: Fecha sin zona horaria (UTC), o None si falta o no es válida
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _is_permanent_error(exc):
+    """
+    Indica si un error de request no debe reintentarse.
+    
+    Los errores de red (sin respuesta) y los códigos de RETRYABLE_STATUS_CODES
+    se reintentan; el resto de errores HTTP (404, 400...) se devuelven al momento.
+    
+    Args:
+        exc (requests.exceptions.RequestException): Excepción capturada
+        
+    Returns:
+        bool: True si hay que abandonar los reintentos
+    """
+    response = getattr(exc, 'response', None)
+    if response is None:
+        return False
+    return response.status_code not in RETRYABLE_STATUS_CODES
+
+
+def _create_session():
+    """
+    Crea la sesión HTTP del cliente.
+    
+    Si config.OPENALEX_HTTP_CACHE está definido y requests-cache está instalado,
+    las respuestas de /sources se guardan en una caché SQLite en disco durante
+    config.OPENALEX_HTTP_CACHE_EXPIRE segundos. Las búsquedas de works no se cachean.
+    
+    Returns:
+        requests.Session: Sesión (con o sin caché en disco)
+    """
+    if not config.OPENALEX_HTTP_CACHE:
+        return requests.Session()
+    
+    try:
+        import requests_cache
+    except ImportError:
+        print("  ⚠️  requests-cache no instalado: caché en disco de OpenAlex desactivada")
+        return requests.Session()
+    
+    host = config.OPENALEX_BASE_URL.split('://')[-1]
+    return requests_cache.CachedSession(
+        cache_name=config.OPENALEX_HTTP_CACHE,
+        backend='sqlite',
+        allowable_codes=(200,),
+        urls_expire_after={
+            f'{host}/sources/*': config.OPENALEX_HTTP_CACHE_EXPIRE,
+            '*': requests_cache.DO_NOT_CACHE,
+        }
+    )
+
+
 class OpenAlexClient:
     """Cliente para la API de OpenAlex con manejo de reintentos."""
     
+    # Caché LRU de sources compartida por todas las instancias del proceso:
+    # clave -> (expira_en, datos), con la misma validez que la caché en disco
+    _source_cache = OrderedDict()
+    _source_cache_lock = threading.Lock()
+    
     def __init__(self, email=None):
         """
         Inicializa el cliente.
@@ -25,25 +179,44 @@ class OpenAlexClient:
         """
         self.base_url = config.OPENALEX_BASE_URL
         self.email = email or config.OPENALEX_EMAIL
-        self.session = requests.Session()
+        self.session = _create_session()
+        
+        # Pool de conexiones persistentes (keep-alive) para evitar un handshake
+        # TCP+TLS por request. Los reintentos los gestiona backoff, no urllib3.
+        adapter = HTTPAdapter(
+            pool_connections=config.OPENALEX_POOL_SIZE,
+            pool_maxsize=config.OPENALEX_POOL_SIZE,
+            max_retries=Retry(total=0)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
         # Headers para todas las requests
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive'
+        })
         if self.email:
             self.session.headers.update({'User-Agent': f'mailto:{self.email}'})
     
     @backoff.on_exception(
         backoff.expo,
-        (requests.exceptions.RequestException, requests.exceptions.HTTPError),
-        max_tries=3,
-        max_time=30
+        requests.exceptions.RequestException,
+        max_tries=5,
+        max_time=60,
+        jitter=backoff.full_jitter,
+        giveup=_is_permanent_error,
+        base=2,
+        factor=0.5
     )
-    def _make_request(self, url, params=None):
+    def _make_request(self, url, params=None, refresh=False):
         """
         Realiza una request HTTP con reintentos automáticos.
         
         Args:
             url (str): URL completa a consultar
             params (dict, optional): Parámetros de la query
+            refresh (bool): Si True, ignora la caché en disco (si la hay) y la renueva
             
         Returns:
             dict: JSON response
@@ -51,13 +224,31 @@ class OpenAlexClient:
         Raises:
             requests.exceptions.HTTPError: Si la request falla después de reintentos
         """
-        # DEBUG: Mostrar URL final antes de la request
-        req = requests.Request("GET", url, params=params).prepare()
-        print(f"🔗 DEBUG OpenAlex URL: {req.url}")
+        # DEBUG: Mostrar URL final antes de la request (solo con DEBUG_HTTP activo)
+        if config.DEBUG_HTTP and logger.isEnabledFor(logging.DEBUG):
+            req = requests.Request("GET", url, params=params).prepare()
+            logger.debug("🔗 DEBUG OpenAlex URL: %s", req.url)
+        
+        # force_refresh solo lo entiende la sesión de requests-cache
+        extra = {'force_refresh': True} if refresh and hasattr(self.session, 'cache') else {}
+        
+        retries_429 = 0
+        while True:
+            response = self.session.get(url, params=params, timeout=30, stream=False, **extra)
+            if response.status_code != 429 or retries_429 >= config.OPENALEX_MAX_429_RETRIES:
+                break
+            
+            # HTTP 429: esperar lo que indique Retry-After; sin cabecera, que decida backoff
+            delay = _retry_after_seconds(response)
+            if delay is None:
+                break
+            delay = min(delay, config.OPENALEX_MAX_RETRY_AFTER)
+            retries_429 += 1
+            print(f"  ⏳ Rate limit (429). Reintentando en {delay:.1f}s ({retries_429}/{config.OPENALEX_MAX_429_RETRIES})...")
+            time.sleep(delay)
         
-        response = self.session.get(url, params=params, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     
     def _build_fulltext_query(self, query_text):
         """
@@ -77,52 +268,27 @@ class OpenAlexClient:
         if len(tokens) < 2:
             return query_text  # Muy corta, devolver tal cual
         
-        # Detectar bigramas fuertes conocidos (frases que deben ir juntas)
-        strong_bigrams = [
-            ('editorial', 'board'),
-            ('machine', 'learning'),
-            ('artificial', 'intelligence'),
-            ('climate', 'change'),
-            ('deep', 'learning'),
-            ('neural', 'network'),
-            ('systematic', 'review'),
-            ('meta', 'analysis'),
-            ('randomized', 'controlled'),
-            ('double', 'blind')
-        ]
-        
-        # Términos genéricos a filtrar del OR-group
-        generic_terms = {
-            'scholarly', 'journal', 'study', 'research', 'analysis', 
-            'paper', 'review', 'article', 'publication', 'science',
-            'scientific', 'academic', 'data', 'results', 'method',
-            'approach', 'using', 'based', 'new', 'model'
-        }
-        
         # Buscar si hay un bigrama fuerte en los primeros tokens
         anchor_phrase = None
         rest_tokens = list(tokens)
+        # Minúsculas calculadas una sola vez (evita .lower() en los bucles)
+        tokens_lower = [t.lower() for t in tokens]
+        rest_tokens_lower = tokens_lower
         
         for i in range(len(tokens) - 1):
-            tok1_lower = tokens[i].lower()
-            tok2_lower = tokens[i + 1].lower()
-            
-            for bigram in strong_bigrams:
-                if tok1_lower == bigram[0] and tok2_lower == bigram[1]:
-                    anchor_phrase = f'{tokens[i]} {tokens[i + 1]}'
-                    # Remover el bigrama de rest_tokens
-                    rest_tokens = tokens[:i] + tokens[i+2:]
-                    break
-            
-            if anchor_phrase:
+            if (tokens_lower[i], tokens_lower[i + 1]) in STRONG_BIGRAMS:
+                anchor_phrase = f'{tokens[i]} {tokens[i + 1]}'
+                # Remover el bigrama de rest_tokens
+                rest_tokens = tokens[:i] + tokens[i+2:]
+                rest_tokens_lower = tokens_lower[:i] + tokens_lower[i+2:]
                 break
         
         # Si encontramos un bigrama fuerte, construir query booleana
         if anchor_phrase and rest_tokens:
             # Filtrar términos genéricos
             filtered_tokens = [
-                tok for tok in rest_tokens 
-                if tok.lower() not in generic_terms
+                tok for tok, tok_lower in zip(rest_tokens, rest_tokens_lower)
+                if tok_lower not in GENERIC_TERMS
             ]
             
             # Limitar a máximo 5 tokens
@@ -141,7 +307,148 @@ class OpenAlexClient:
         # Si no hay bigrama fuerte, devolver query normal
         return query_text
     
-    def search_works_by_text(self, query_text, per_page=200, max_pages=2, search_mode="title_abstract"):
+    def _paginate(self, url, base_params, per_page, max_pages, select=None):
+        """
+        Descarga hasta max_pages páginas de resultados ordenados por relevancia.
+        
+        Punto único de paginación: añade los parámetros comunes (orden, tamaño
+        de página, mailto, select) y elige la estrategia. Con page= las páginas
+        se descargan en paralelo; si se piden más resultados de los que permite
+        page= (MAX_PAGED_RESULTS), se recorre con cursor.
+        
+        Args:
+            url (str): URL del endpoint
+            base_params (dict): Parámetros propios de la búsqueda ('filter' o 'search')
+            per_page (int): Resultados por página (máx 200)
+            max_pages (int): Número máximo de páginas a descargar
+            select (str, optional): Campos a devolver por resultado
+            
+        Returns:
+            list: Resultados de todas las páginas, en orden
+        """
+        params = dict(base_params, sort='relevance_score:desc', per_page=min(per_page, 200))
+        if self.email:
+            params['mailto'] = self.email
+        if select:
+            params['select'] = select
+        
+        if max_pages * params['per_page'] > MAX_PAGED_RESULTS:
+            return self._fetch_pages_cursor(url, params, max_pages)
+        return self._fetch_pages(url, params, max_pages)
+    
+    def _fetch_pages(self, url, params, max_pages):
+        """
+        Descarga hasta max_pages páginas con page=.
+        
+        La primera página se pide sola para conocer meta.count; el resto de
+        páginas son independientes entre sí y se descargan en paralelo sobre
+        la misma sesión (pool keep-alive).
+        
+        Args:
+            url (str): URL del endpoint
+            params (dict): Parámetros de la query (sin 'page')
+            max_pages (int): Número máximo de páginas a descargar
+            
+        Returns:
+            list: Resultados de todas las páginas, en orden
+        """
+        print(f"  Descargando página 1/{max_pages}...")
+        try:
+            data = self._make_request(url, dict(params, page=1))
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 429:
+                print(f"  ⚠️  Rate limit persistente en página 1 tras reintentos. Deteniendo descarga.")
+                return []
+            raise
+        
+        results = data.get('results', [])
+        if not results:
+            print(f"  No hay más resultados en página 1")
+            return []
+        
+        all_results = list(results)
+        
+        # Info de metadatos
+        total_count = data.get('meta', {}).get('count', 0)
+        print(f"  → {len(results)} works descargados (total disponible: {total_count})")
+        
+        last_page = min(max_pages, math.ceil(total_count / params['per_page']))
+        if last_page < 2:
+            return all_results
+        
+        pages = range(2, last_page + 1)
+        print(f"  Descargando páginas 2-{last_page} en paralelo...")
+        
+        with ThreadPoolExecutor(max_workers=min(config.OPENALEX_MAX_WORKERS, len(pages))) as executor:
+            futures = [
+                executor.submit(self._make_request, url, dict(params, page=page))
+                for page in pages
+            ]
+            
+            for page, future in zip(pages, futures):
+                try:
+                    data = future.result()
+                except requests.exceptions.HTTPError as e:
+                    if e.response.status_code == 429:
+                        print(f"  ⚠️  Rate limit persistente en página {page} tras reintentos. Deteniendo descarga.")
+                        break
+                    raise
+                
+                results = data.get('results', [])
+                if not results:
+                    print(f"  No hay más resultados en página {page}")
+                    break
+                
+                all_results.extend(results)
+                print(f"  → Página {page}: {len(results)} works descargados")
+        
+        return all_results
+    
+    def _fetch_pages_cursor(self, url, params, max_pages):
+        """
+        Descarga hasta max_pages páginas siguiendo meta.next_cursor.
+        
+        A diferencia de page=, el coste de cada página con cursor no crece con
+        la profundidad, pero las páginas se piden en secuencia.
+        
+        Args:
+            url (str): URL del endpoint
+            params (dict): Parámetros de la query (sin 'page' ni 'cursor')
+            max_pages (int): Número máximo de páginas a descargar
+            
+        Returns:
+            list: Resultados de todas las páginas, en orden
+        """
+        all_results = []
+        cursor = '*'
+        
+        for page in range(1, max_pages + 1):
+            print(f"  Descargando página {page}/{max_pages} (cursor)...")
+            try:
+                data = self._make_request(url, dict(params, cursor=cursor))
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 429:
+                    print(f"  ⚠️  Rate limit persistente en página {page} tras reintentos. Deteniendo descarga.")
+                    break
+                raise
+            
+            results = data.get('results', [])
+            if not results:
+                print(f"  No hay más resultados en página {page}")
+                break
+            
+            all_results.extend(results)
+            
+            meta = data.get('meta', {})
+            print(f"  → {len(results)} works descargados (total disponible: {meta.get('count', 0)})")
+            
+            cursor = meta.get('next_cursor')
+            if not cursor:
+                break
+        
+        return all_results
+    
+    def search_works_by_text(self, query_text, per_page=200, max_pages=2, search_mode="title_abstract", select=None):
         """
         Busca trabajos (works) en OpenAlex por texto.
         
@@ -150,6 +457,8 @@ class OpenAlexClient:
             per_page (int): Resultados por página (máx 200)
             max_pages (int): Número máximo de páginas a descargar
             search_mode (str): "title_abstract" (preciso) o "fulltext" (amplio)
+            select (str, optional): Campos a devolver por work (ej: "id,title,primary_location").
+                Por defecto OpenAlex devuelve el objeto completo
             
         Returns:
             tuple: (works, did_fallback)
@@ -161,7 +470,6 @@ class OpenAlexClient:
         """
         try:
             url = f"{self.base_url}/works"
-            all_works = []
             did_fallback = False
             
             # Estrategia de búsqueda
@@ -169,38 +477,10 @@ class OpenAlexClient:
                 print(f"\n🔍 Modo PRECISO: title_and_abstract.search")
                 
                 # Intento 1: Modo preciso
-                for page in range(1, max_pages + 1):
-                    params = {
-                        'filter': f'title_and_abstract.search:{query_text}',
-                        'sort': 'relevance_score:desc',
-                        'per_page': min(per_page, 200),
-                        'page': page
-                    }
-                    if self.email:
-                        params['mailto'] = self.email
-                    
-                    print(f"  Descargando página {page}/{max_pages}...")
-                    
-                    try:
-                        data = self._make_request(url, params)
-                        results = data.get('results', [])
-                        
-                        if not results:
-                            print(f"  No hay más resultados en página {page}")
-                            break
-                        
-                        all_works.extend(results)
-                        
-                        # Info de metadatos
-                        meta = data.get('meta', {})
-                        total_count = meta.get('count', 0)
-                        print(f"  → {len(results)} works descargados (total disponible: {total_count})")
-                        
-                    except requests.exceptions.HTTPError as e:
-                        if e.response.status_code == 429:
-                            print(f"  ⚠️  Rate limit alcanzado en página {page}. Deteniendo descarga.")
-                            break
-                        raise
+                all_works = self._paginate(
+                    url, {'filter': f'title_and_abstract.search:{query_text}'},
+                    per_page, max_pages, select
+                )
                 
                 # Si no hay resultados, hacer fallback a fulltext
                 if not all_works:
@@ -211,38 +491,7 @@ class OpenAlexClient:
                     fulltext_query = self._build_fulltext_query(query_text)
                     print(f"\n🔍 Fallback FULLTEXT query usada: {fulltext_query}")
                     
-                    for page in range(1, max_pages + 1):
-                        params = {
-                            'search': fulltext_query,
-                            'sort': 'relevance_score:desc',
-                            'per_page': min(per_page, 200),
-                            'page': page
-                        }
-                        if self.email:
-                            params['mailto'] = self.email
-                        
-                        print(f"  Descargando página {page}/{max_pages}...")
-                        
-                        try:
-                            data = self._make_request(url, params)
-                            results = data.get('results', [])
-                            
-                            if not results:
-                                print(f"  No hay más resultados en página {page}")
-                                break
-                            
-                            all_works.extend(results)
-                            
-                            # Info de metadatos
-                            meta = data.get('meta', {})
-                            total_count = meta.get('count', 0)
-                            print(f"  → {len(results)} works descargados (total disponible: {total_count})")
-                            
-                        except requests.exceptions.HTTPError as e:
-                            if e.response.status_code == 429:
-                                print(f"  ⚠️  Rate limit alcanzado en página {page}. Deteniendo descarga.")
-                                break
-                            raise
+                    all_works = self._paginate(url, {'search': fulltext_query}, per_page, max_pages, select)
             else:
                 # Modo amplio directo
                 # Construir query booleana optimizada
@@ -250,38 +499,7 @@ class OpenAlexClient:
                 print(f"\n🔍 Modo AMPLIO: fulltext search")
                 print(f"  Query booleana: {fulltext_query}")
                 
-                for page in range(1, max_pages + 1):
-                    params = {
-                        'search': fulltext_query,
-                        'sort': 'relevance_score:desc',
-                        'per_page': min(per_page, 200),
-                        'page': page
-                    }
-                    if self.email:
-                        params['mailto'] = self.email
-                    
-                    print(f"  Descargando página {page}/{max_pages}...")
-                    
-                    try:
-                        data = self._make_request(url, params)
-                        results = data.get('results', [])
-                        
-                        if not results:
-                            print(f"  No hay más resultados en página {page}")
-                            break
-                        
-                        all_works.extend(results)
-                        
-                        # Info de metadatos
-                        meta = data.get('meta', {})
-                        total_count = meta.get('count', 0)
-                        print(f"  → {len(results)} works descargados (total disponible: {total_count})")
-                        
-                    except requests.exceptions.HTTPError as e:
-                        if e.response.status_code == 429:
-                            print(f"  ⚠️  Rate limit alcanzado en página {page}. Deteniendo descarga.")
-                            break
-                        raise
+                all_works = self._paginate(url, {'search': fulltext_query}, per_page, max_pages, select)
             
             if all_works:
                 print(f"\n✅ Total descargado: {len(all_works)} works")
@@ -294,12 +512,16 @@ class OpenAlexClient:
             print(f"❌ Error al buscar works en OpenAlex: {e}")
             raise
     
-    def get_source(self, source_id):
+    def get_source(self, source_id, select=None, refresh=False):
         """
         Obtiene información detallada de una fuente/revista por su ID.
         
         Args:
             source_id (str): ID de OpenAlex de la fuente (ej: 'S12345678')
+            select (str, optional): Campos a devolver (ej: "id,works_count,summary_stats").
+                Por defecto OpenAlex devuelve el objeto completo
+            refresh (bool): Si True, ignora las cachés (memoria y disco) y pide
+                los datos actuales a OpenAlex
             
         Returns:
             dict: Información de la fuente, o None si no se encuentra
@@ -310,10 +532,33 @@ class OpenAlexClient:
                 # Extraer el ID del URL
                 source_id = source_id.split('/')[-1]
             
+            cache_key = (self.base_url, source_id, select)
+            if not refresh:
+                with self._source_cache_lock:
+                    entry = self._source_cache.get(cache_key)
+                    if entry is not None:
+                        expires_at, cached = entry
+                        if expires_at > time.monotonic():
+                            self._source_cache.move_to_end(cache_key)
+                            return cached
+                        # Caducado: se trata como un fallo de caché
+                        del self._source_cache[cache_key]
+            
             url = f"{self.base_url}/sources/{source_id}"
             params = {'mailto': self.email} if self.email else {}
+            if select:
+                params['select'] = select
             
-            data = self._make_request(url, params)
+            data = self._make_request(url, params, refresh=refresh)
+            
+            # Solo se cachean respuestas válidas (los errores se reintentan)
+            if data:
+                expires_at = time.monotonic() + config.OPENALEX_HTTP_CACHE_EXPIRE
+                with self._source_cache_lock:
+                    self._source_cache[cache_key] = (expires_at, data)
+                    self._source_cache.move_to_end(cache_key)
+                    if len(self._source_cache) > config.OPENALEX_SOURCE_CACHE_SIZE:
+                        self._source_cache.popitem(last=False)
             return data
             
         except requests.exceptions.HTTPError as e:
@@ -325,11 +570,118 @@ class OpenAlexClient:
         except Exception as e:
             print(f"  ❌ Error inesperado al obtener fuente {source_id}: {e}")
             return None
+    
+    def search_sources(self, search_param=None, filter_param=None, per_page=20):
+        """
+        Busca fuentes/revistas en OpenAlex (una sola página de resultados).
+        
+        Args:
+            search_param (str, optional): Texto a buscar (ej: "Nature")
+            filter_param (str, optional): Filtro de OpenAlex (ej: "issn:1234-5678")
+            per_page (int): Resultados por página
+            
+        Returns:
+            list: Sources encontrados
+            
+        Raises:
+            requests.exceptions.RequestException: Si la request falla tras los reintentos
+        """
+        url = f"{self.base_url}/sources"
+        params = {'per_page': per_page}
+        if self.email:
+            params['mailto'] = self.email
+        if filter_param:
+            params['filter'] = filter_param
+        if search_param:
+            params['search'] = search_param
+        
+        data = self._make_request(url, params)
+        return data.get('results', [])
+    
+    def get_source_by_issn(self, issn):
+        """
+        Obtiene una fuente por ISSN con el endpoint directo /sources/issn:XXXX-XXXX.
+        
+        Args:
+            issn (str): ISSN con guion (ej: '1234-5678')
+            
+        Returns:
+            dict: Información de la fuente, o None si OpenAlex no la conoce (404)
+            
+        Raises:
+            requests.exceptions.HTTPError: Para otros errores HTTP (con la respuesta adjunta)
+        """
+        url = f"{self.base_url}/sources/issn:{issn}"
+        params = {'mailto': self.email} if self.email else {}
+        
+        try:
+            return self._make_request(url, params)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+    
+    def get_sources_updated_dates(self, source_ids):
+        """
+        Obtiene la fecha de última actualización de varias fuentes en una sola request.
+        
+        Args:
+            source_ids (list): IDs de OpenAlex (como mucho config.OPENALEX_FILTER_BATCH_SIZE)
+            
+        Returns:
+            dict: {source_id: datetime} con el updated_date de OpenAlex.
+                  Vacío si la request falla (el llamador debe asumir que todo cambió)
+        """
+        if not source_ids:
+            return {}
+        
+        url = f"{self.base_url}/sources"
+        params = {
+            'filter': 'ids.openalex:' + '|'.join(source_ids),
+            'select': 'id,updated_date',
+            'per_page': len(source_ids)
+        }
+        if self.email:
+            params['mailto'] = self.email
+        
+        try:
+            data = self._make_request(url, params)
+        except Exception as e:
+            print(f"  ⚠️  No se pudo consultar updated_date de {len(source_ids)} fuentes: {e}")
+            return {}
+        
+        updated_dates = {}
+        for source in data.get('results', []):
+            source_id = (source.get('id') or '').split('/')[-1]
+            updated_date = parse_openalex_date(source.get('updated_date'))
+            if updated_date is not None:
+                updated_dates[source_id] = updated_date
+        return updated_dates
+
+
+# Funciones de conveniencia para usar sin instanciar la clase.
+# Comparten un único cliente por proceso para reutilizar el pool keep-alive.
 
+_default_client = None
+_default_client_lock = threading.Lock()
 
-# Funciones de conveniencia para usar sin instanciar la clase
 
-def search_works_by_text(query_text, per_page=200, max_pages=2, search_mode="title_abstract"):
+def _client():
+    """
+    Devuelve el cliente compartido, creándolo la primera vez (thread-safe).
+    
+    Returns:
+        OpenAlexClient: Cliente por defecto del proceso
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = OpenAlexClient()
+    return _default_client
+
+
+def search_works_by_text(query_text, per_page=200, max_pages=2, search_mode="title_abstract", select=None):
     """
     Busca trabajos en OpenAlex (función de conveniencia).
     
@@ -338,30 +690,59 @@ def search_works_by_text(query_text, per_page=200, max_pages=2, search_mode="tit
         per_page (int): Resultados por página
         max_pages (int): Páginas máximas a descargar
         search_mode (str): "title_abstract" (preciso) o "fulltext" (amplio)
+        select (str, optional): Campos a devolver por work
         
     Returns:
         tuple: (works, did_fallback)
             - works: Lista de works
             - did_fallback: bool indicando si se hizo fallback a fulltext
     """
-    client = OpenAlexClient()
-    return client.search_works_by_text(query_text, per_page, max_pages, search_mode)
+    return _client().search_works_by_text(query_text, per_page, max_pages, search_mode, select)
 
 
-def get_source(source_id):
+def get_source(source_id, select=None, refresh=False):
     """
     Obtiene una fuente de OpenAlex (función de conveniencia).
     
     Args:
         source_id (str): ID de la fuente
+        select (str, optional): Campos a devolver
+        refresh (bool): Si True, ignora las cachés y pide los datos actuales
         
     Returns:
         dict: Información de la fuente
     """
-    client = OpenAlexClient()
-    return client.get_source(source_id)
+    return _client().get_source(source_id, select, refresh)
 
 
+
+def search_sources(search_param=None, filter_param=None, per_page=20):
+    """
+    Busca fuentes en OpenAlex (función de conveniencia).
+    
+    Args:
+        search_param (str, optional): Texto a buscar
+        filter_param (str, optional): Filtro de OpenAlex
+        per_page (int): Resultados por página
+        
+    Returns:
+        list: Sources encontrados
+    """
+    return _client().search_sources(search_param, filter_param, per_page)
+
+
+def get_source_by_issn(issn):
+    """
+    Obtiene una fuente por ISSN (función de conveniencia).
+    
+    Args:
+        issn (str): ISSN con guion (ej: '1234-5678')
+        
+    Returns:
+        dict: Información de la fuente, o None si no se encuentra
+    """
+    return _client().get_source_by_issn(issn)
+
 if __name__ == "__main__":
     # Test del cliente
     print("Testing OpenAlex Client...")
@@ -4,14 +4,126 @@ Actualiza: two_yr_mean_citedness, works_ref_year, cites_ref_year
 """
 import sys
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from sqlalchemy import text
 
 # Agregar el directorio raíz al path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from etl.openalex_client import get_source
+from etl.openalex_client import OpenAlexClient, parse_openalex_date
 from db.connection import get_engine
+from ml.ranker import invalidate_sources
+import config
+
+
+# Campos de OpenAlex necesarios para extract_metrics
+SOURCE_METRICS_FIELDS = 'id,updated_date,counts_by_year,summary_stats,works_count,cited_by_count'
+
+# Revistas a las que les falta alguna métrica
+# (entre paréntesis para poder añadir más condiciones con AND)
+MISSING_METRICS_WHERE = """
+    WHERE (two_yr_mean_citedness IS NULL 
+       OR works_ref_year IS NULL 
+       OR cites_ref_year IS NULL)
+"""
+
+
+def extract_metrics(source_data, ref_year):
+    """
+    Extrae las métricas a actualizar desde los datos de un source de OpenAlex.
+    
+    Args:
+        source_data (dict): Source devuelto por OpenAlex
+        ref_year (int): Año de referencia para counts_by_year
+        
+    Returns:
+        dict: Parámetros para el UPDATE de sources (incluye el updated_date de
+              OpenAlex de esta respuesta como 'openalex_updated')
+    """
+    # Buscar datos del año de referencia en counts_by_year
+    works_ref_year = None
+    cites_ref_year = None
+    for year_entry in source_data.get('counts_by_year', []):
+        if year_entry.get('year') == ref_year:
+            works_ref_year = year_entry.get('works_count')
+            cites_ref_year = year_entry.get('cited_by_count')
+            break
+    
+    return {
+        'two_yr': (source_data.get('summary_stats') or {}).get('2yr_mean_citedness'),
+        'works_ref': works_ref_year,
+        'cites_ref': cites_ref_year,
+        'works_count': source_data.get('works_count', 0),
+        'cited_count': source_data.get('cited_by_count', 0),
+        'openalex_updated': parse_openalex_date(source_data.get('updated_date')),
+    }
+
+
+def is_unchanged(checked_updated, remote_updated):
+    """
+    Indica si un source no ha cambiado en OpenAlex desde el último intento de
+    completar sus métricas.
+    
+    Se compara con el updated_date de OpenAlex guardado en ese intento
+    (sources.openalex_updated_date), no con nuestro updated_date: este último
+    es la hora de escritura y puede ser posterior a la respuesta usada (caché
+    HTTP de hasta un día). Ambas fechas vienen del mismo reloj (OpenAlex, UTC).
+    
+    Args:
+        checked_updated (datetime): updated_date de OpenAlex del último intento
+            (None si nunca se intentó: no se omite)
+        remote_updated (datetime): updated_date actual en OpenAlex (None si se desconoce)
+        
+    Returns:
+        bool: True si volver a pedirlo devolvería los mismos datos
+    """
+    if checked_updated is None or remote_updated is None:
+        return False
+    return checked_updated >= remote_updated
+
+
+def save_metrics(engine, updates):
+    """
+    Guarda en sources las métricas actualizadas en una sola transacción.
+    
+    Un UPDATE por revista ejecutado con executemany dentro de una única
+    transacción (un solo commit por lote en lugar de uno por revista). Solo se
+    modifican filas existentes: un source_id que ya no está en sources no crea
+    una fila vacía.
+    
+    updated_date se escribe en UTC desde Python, igual que build_source_row en
+    load_openalex, para que todas las escrituras usen el mismo reloj.
+    openalex_updated_date registra la versión de OpenAlex usada en este intento
+    (ver is_unchanged), aunque siga sin traer alguna métrica.
+    
+    Args:
+        engine: SQLAlchemy engine
+        updates (list): Parámetros por revista (ver extract_metrics) con source_id
+    """
+    update_sql = text("""
+        UPDATE sources
+        SET two_yr_mean_citedness = :two_yr,
+            works_ref_year = :works_ref,
+            cites_ref_year = :cites_ref,
+            works_count = :works_count,
+            cited_by_count = :cited_count,
+            openalex_updated_date = :openalex_updated,
+            updated_date = :updated_date
+        WHERE source_id = :source_id
+    """)
+    
+    now = datetime.utcnow()
+    rows = [dict(params, updated_date=now) for params in updates]
+    
+    with engine.begin() as conn:
+        for start in range(0, len(rows), config.DB_BATCH_SIZE):
+            conn.execute(update_sql, rows[start:start + config.DB_BATCH_SIZE])
+    
+    # El ranker no debe puntuar con las métricas anteriores
+    invalidate_sources(params['source_id'] for params in updates)
 
 
 def update_sources_with_missing_metrics():
@@ -30,21 +142,13 @@ def update_sources_with_missing_metrics():
     print("-" * 70)
     
     with engine.connect() as conn:
-        result = conn.execute(text("""
-            SELECT source_id, display_name
-            FROM sources
-            WHERE two_yr_mean_citedness IS NULL 
-               OR works_ref_year IS NULL 
-               OR cites_ref_year IS NULL
-        """))
-        
-        sources_to_update = result.fetchall()
+        pending = conn.execute(text(f"SELECT COUNT(*) FROM sources {MISSING_METRICS_WHERE}")).scalar()
     
-    if not sources_to_update:
+    if not pending:
         print("✅ No hay revistas con métricas faltantes")
         return
     
-    print(f"✅ {len(sources_to_update)} revistas necesitan actualización")
+    print(f"✅ {pending} revistas necesitan actualización")
     print()
     
     # Paso 2: Actualizar cada revista
@@ -53,65 +157,155 @@ def update_sources_with_missing_metrics():
     
     updated_count = 0
     error_count = 0
+    skipped_count = 0
     ref_year = datetime.utcnow().year - 4
     
-    for source_id, display_name in sources_to_update:
+    # Un único cliente (una sola requests.Session) compartido por todos los hilos
+    client = OpenAlexClient()
+    lock = threading.Lock()
+    
+    # Cola acotada de lotes: el productor (páginas de MySQL) se bloquea si los
+    # consumidores (llamadas a OpenAlex) van por detrás, con memoria constante
+    work_queue = queue.Queue(maxsize=config.WORK_QUEUE_SIZE)
+    futures = []
+    
+    def process(source_id, display_name):
+        """Devuelve los parámetros del UPDATE de una revista, o None si falla."""
+        nonlocal error_count
         try:
-            print(f"  Procesando: {display_name} ({source_id})...", end=" ")
-            
-            # Obtener datos completos de OpenAlex
-            source_data = get_source(source_id)
+            # Solo llegan aquí revistas que han cambiado en OpenAlex o que nunca se
+            # han intentado completar: una copia en caché devolvería datos antiguos
+            source_data = client.get_source(source_id, SOURCE_METRICS_FIELDS, refresh=True)
             
             if not source_data:
-                print("❌ No encontrado en OpenAlex")
+                print(f"  ❌ {display_name} ({source_id}): No encontrado en OpenAlex")
+                with lock:
+                    error_count += 1
+                return None
+            
+            params = extract_metrics(source_data, ref_year)
+            params['source_id'] = source_id
+            print(f"  ✅ {display_name} ({source_id})")
+            return params
+            
+        except Exception as e:
+            print(f"  ❌ {display_name} ({source_id}): Error: {e}")
+            with lock:
                 error_count += 1
+            return None
+    
+    def process_batch(batch):
+        nonlocal skipped_count
+        # Una sola request para saber qué fuentes han cambiado en OpenAlex
+        # desde el último intento de completar sus métricas
+        remote_dates = client.get_sources_updated_dates([row[0] for row in batch])
+        
+        batch_updates = []
+        for source_id, display_name, checked_updated in batch:
+            try:
+                unchanged = is_unchanged(checked_updated, remote_dates.get(source_id))
+            except (AttributeError, TypeError):
+                # Fecha guardada ilegible: se trata como si hubiera cambiado
+                unchanged = False
+            if unchanged:
+                with lock:
+                    skipped_count += 1
                 continue
+            params = process(source_id, display_name)
+            if params:
+                batch_updates.append(params)
+        return batch_updates
+    
+    def consume():
+        nonlocal updated_count, error_count
+        while True:
+            batch = work_queue.get()
+            if batch is None:
+                return
             
-            # Buscar datos del año de referencia en counts_by_year
-            works_ref_year = None
-            cites_ref_year = None
-            for year_entry in source_data.get('counts_by_year', []):
-                if year_entry.get('year') == ref_year:
-                    works_ref_year = year_entry.get('works_count')
-                    cites_ref_year = year_entry.get('cited_by_count')
-                    break
-            
-            # Extraer two_yr_mean_citedness
-            two_yr_mean_citedness = source_data.get('summary_stats', {}).get('2yr_mean_citedness')
+            try:
+                batch_updates = process_batch(batch)
+            except Exception as e:
+                print(f"  ❌ Error procesando un lote de {len(batch)} revistas: {e}")
+                with lock:
+                    error_count += len(batch)
+                continue
             
-            # Actualizar en MySQL
+            # Guardar cada lote al terminarlo: un fallo posterior no pierde lo ya descargado
+            if batch_updates:
+                try:
+                    save_metrics(engine, batch_updates)
+                    with lock:
+                        updated_count += len(batch_updates)
+                except Exception as e:
+                    print(f"  ❌ Error al guardar métricas en MySQL: {e}")
+                    with lock:
+                        error_count += len(batch_updates)
+    
+    def enqueue(item):
+        """Encola sin bloquear para siempre si ya no queda ningún consumidor vivo."""
+        while True:
+            try:
+                work_queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                if all(future.done() for future in futures):
+                    return False
+    
+    # Paginación por clave (source_id > último visto) con conexiones cortas: no
+    # se mantiene ningún cursor de MySQL abierto mientras se espera a OpenAlex
+    page_sql = text(f"""
+        SELECT source_id, display_name, openalex_updated_date
+        FROM sources
+        {MISSING_METRICS_WHERE}
+          AND source_id > :last_id
+        ORDER BY source_id
+        LIMIT :limit
+    """)
+    
+    def produce():
+        last_id = ''
+        while True:
             with engine.connect() as conn:
-                update_sql = text("""
-                    UPDATE sources SET
-                        two_yr_mean_citedness = :two_yr,
-                        works_ref_year = :works_ref,
-                        cites_ref_year = :cites_ref,
-                        works_count = :works_count,
-                        cited_by_count = :cited_count,
-                        updated_date = NOW()
-                    WHERE source_id = :source_id
-                """)
-                
-                conn.execute(update_sql, {
-                    'two_yr': two_yr_mean_citedness,
-                    'works_ref': works_ref_year,
-                    'cites_ref': cites_ref_year,
-                    'works_count': source_data.get('works_count', 0),
-                    'cited_count': source_data.get('cited_by_count', 0),
-                    'source_id': source_id
-                })
-                conn.commit()
+                rows = [tuple(row) for row in conn.execute(
+                    page_sql, {'last_id': last_id, 'limit': config.DB_STREAM_BATCH_SIZE}
+                )]
+            if not rows:
+                return
+            last_id = rows[-1][0]
             
-            updated_count += 1
-            print("✅")
+            for start in range(0, len(rows), config.OPENALEX_FILTER_BATCH_SIZE):
+                if not enqueue(rows[start:start + config.OPENALEX_FILTER_BATCH_SIZE]):
+                    print("  ❌ Todos los hilos de descarga han terminado; se detiene la lectura")
+                    return
             
+            if len(rows) < config.DB_STREAM_BATCH_SIZE:
+                return
+    
+    with ThreadPoolExecutor(max_workers=config.OPENALEX_MAX_WORKERS) as executor:
+        futures.extend(executor.submit(consume) for _ in range(config.OPENALEX_MAX_WORKERS))
+        
+        try:
+            produce()
+        except Exception as e:
+            print(f"❌ Error leyendo revistas pendientes de MySQL: {e}")
+        finally:
+            # Una señal de fin por consumidor
+            for _ in futures:
+                if not enqueue(None):
+                    break
+    
+    # Los fallos de un consumidor no deben pasar desapercibidos
+    for future in futures:
+        try:
+            future.result()
         except Exception as e:
-            print(f"❌ Error: {e}")
-            error_count += 1
+            print(f"❌ Un hilo de descarga terminó con error: {e}")
     
     print()
     print("-" * 70)
     print(f"✅ {updated_count} revistas actualizadas")
+    print(f"   {skipped_count} revistas sin cambios en OpenAlex desde el último intento (omitidas)")
     if error_count > 0:
         print(f"⚠️  {error_count} revistas con errores")
     print()
@@ -121,15 +315,7 @@ def update_sources_with_missing_metrics():
     print("-" * 70)
     
     with engine.connect() as conn:
-        result = conn.execute(text("""
-            SELECT COUNT(*) as total
-            FROM sources
-            WHERE two_yr_mean_citedness IS NULL 
-               OR works_ref_year IS NULL 
-               OR cites_ref_year IS NULL
-        """))
-        
-        remaining = result.fetchone()[0]
+        remaining = conn.execute(text(f"SELECT COUNT(*) FROM sources {MISSING_METRICS_WHERE}")).scalar()
     
     print(f"Revistas con métricas faltantes restantes: {remaining}")
     print()
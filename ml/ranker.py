@@ -5,14 +5,170 @@ import pandas as pd
 import numpy as np
 import sys
 import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import text, bindparam
 
 # Agregar el directorio raíz al path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.connection import get_engine
+import config
 
+logger = logging.getLogger(__name__)
 
-def calculate_scores(df_candidates):
+# Columnas de sources (+ SJR) que usa el ranker
+SOURCE_COLUMNS = [
+    'source_id', 'display_name', 'works_count', 'cited_by_count',
+    'two_yr_mean_citedness', 'works_ref_year', 'cites_ref_year', 'type',
+    'publisher', 'country_code', 'issn_l', 'quartile', 'sjr'
+]
+
+# Pesos del score: cada columna se normaliza por su máximo (0-1)
+SCORE_WEIGHTS = (
+    ('freq', 0.75),
+    ('two_yr_mean_citedness', 0.15),
+    ('works_ref_year', 0.05),
+    ('cites_ref_year', 0.05),
+)
+
+# Tipos explícitos de las columnas numéricas (enteros nullable: pueden venir NULL)
+SOURCE_DTYPES = {
+    'works_count': 'Int64',
+    'cited_by_count': 'Int64',
+    'two_yr_mean_citedness': 'float32',
+    'works_ref_year': 'Int32',
+    'cites_ref_year': 'Int32',
+    'sjr': 'float32',
+}
+
+# Caché en memoria de filas de sources: source_id -> (expira_en, fila). El TTL
+# es fijo, así que el orden de inserción es también el de caducidad: las
+# entradas caducadas y las que sobran por tamaño se sacan siempre del principio
+_SOURCES_CACHE = OrderedDict()
+_SOURCES_CACHE_LOCK = threading.Lock()
+
+# Marca en la caché de un source_id que no existe en MySQL (caché negativa)
+_MISSING_SOURCE = object()
+
+
+def invalidate_sources(source_ids):
+    """
+    Elimina de la caché del ranker las filas de sources recién escritas en MySQL.
+    
+    Args:
+        source_ids (iterable): IDs de sources actualizados
+    """
+    with _SOURCES_CACHE_LOCK:
+        for sid in source_ids:
+            _SOURCES_CACHE.pop(sid, None)
+
+
+def fetch_sources(source_ids):
+    """
+    Obtiene los datos de sources (con SJR) para una lista de IDs.
+    
+    Las filas se guardan en una caché en memoria (como mucho SOURCES_CACHE_SIZE)
+    durante SOURCES_CACHE_TTL segundos o hasta que se reescriben en MySQL (ver
+    invalidate_sources); solo los IDs ausentes o caducados se consultan a MySQL.
+    Los IDs que MySQL no devuelve también se recuerdan, con el mismo TTL, para
+    no volver a consultarlos. Si todos están en caché no se abre ninguna conexión.
+    
+    Args:
+        source_ids (list): IDs de sources a obtener
+        
+    Returns:
+        pd.DataFrame: Una fila por source encontrado, columnas SOURCE_COLUMNS
+    """
+    now = time.monotonic()
+    found = {}
+    missing = []
+    with _SOURCES_CACHE_LOCK:
+        for sid in dict.fromkeys(source_ids):
+            entry = _SOURCES_CACHE.get(sid)
+            if entry is not None and entry[0] > now:
+                if entry[1] is not _MISSING_SOURCE:
+                    found[sid] = entry[1]
+            else:
+                missing.append(sid)
+    
+    if missing:
+        query = text("""
+        SELECT 
+            s.source_id,
+            s.display_name,
+            s.works_count,
+            s.cited_by_count,
+            s.two_yr_mean_citedness,
+            s.works_ref_year,
+            s.cites_ref_year,
+            s.type,
+            s.publisher,
+            s.country_code,
+            s.issn_l,
+            sjr.quartile,
+            sjr.sjr
+        FROM sources s
+        LEFT JOIN sjr_2024 sjr
+            ON REPLACE(s.issn_l, '-', '') = sjr.issn_norm
+        WHERE s.source_id IN :ids
+        """).bindparams(bindparam('ids', expanding=True))
+        
+        df_missing = pd.read_sql(query, get_engine(), params={'ids': missing}, dtype=SOURCE_DTYPES)
+        now = time.monotonic()
+        expires_at = now + config.SOURCES_CACHE_TTL
+        with _SOURCES_CACHE_LOCK:
+            for row in df_missing.to_dict('records'):
+                found[row['source_id']] = row
+                _SOURCES_CACHE[row['source_id']] = (expires_at, row)
+                _SOURCES_CACHE.move_to_end(row['source_id'])
+            
+            # IDs sin fila en MySQL: se recuerdan hasta que caduquen o se inserten
+            for sid in missing:
+                if sid not in found:
+                    _SOURCES_CACHE[sid] = (expires_at, _MISSING_SOURCE)
+                    _SOURCES_CACHE.move_to_end(sid)
+            
+            # Purgar caducadas y limitar el tamaño (ambas desde el principio)
+            while _SOURCES_CACHE and (
+                len(_SOURCES_CACHE) > config.SOURCES_CACHE_SIZE
+                or next(iter(_SOURCES_CACHE.values()))[0] <= now
+            ):
+                _SOURCES_CACHE.popitem(last=False)
+    
+    rows = [found[sid] for sid in dict.fromkeys(source_ids) if sid in found]
+    
+    return pd.DataFrame(rows, columns=SOURCE_COLUMNS).astype(SOURCE_DTYPES)
+
+
+def weighted_score(weighted_columns):
+    """
+    Suma ponderada de columnas normalizadas por su máximo.
+    
+    La división por el máximo se pliega en el peso escalar y el resultado se
+    acumula in-place sobre dos buffers preasignados (float32 basta para
+    ordenar y mostrar el score), sin arrays temporales por término.
+    
+    Args:
+        weighted_columns (list): Pares (np.ndarray float32, peso)
+        
+    Returns:
+        np.ndarray: Score por fila (float32)
+    """
+    n = len(weighted_columns[0][0])
+    score = np.zeros(n, dtype=np.float32)
+    scratch = np.empty(n, dtype=np.float32)
+    for values, weight in weighted_columns:
+        max_value = values.max() if n else 0
+        if max_value > 0:
+            np.multiply(values, np.float32(weight / max_value), out=scratch)
+            np.add(score, scratch, out=score)
+    return score
+
+
+def calculate_scores(df_candidates, top_n=None):
     """
     Calcula scores de recomendación para cada revista candidata.
     
@@ -21,6 +177,7 @@ def calculate_scores(df_candidates):
     
     Args:
         df_candidates (pd.DataFrame): DataFrame con columnas ['source_id', 'freq', ...]
+        top_n (int, optional): Si se indica, solo se ordenan y devuelven las top N
         
     Returns:
         pd.DataFrame: DataFrame con columnas adicionales ['score', 'why', 'rank_position']
@@ -32,48 +189,30 @@ def calculate_scores(df_candidates):
     if 'display_name' not in df_candidates.columns:
         df_candidates['display_name'] = ''
     
-    print("Calculando scores de recomendación...")
-    print("-" * 70)
-    
-    # Obtener engine para consultas a MySQL
-    engine = get_engine()
+    logger.debug("Calculando scores de recomendación...")
     
-    # Enriquecer con datos de MySQL (incluye LEFT JOIN con SJR)
+    # Enriquecer con datos de MySQL (incluye LEFT JOIN con SJR); solo se
+    # consulta la base de datos para los sources que no están en caché
     source_ids = df_candidates['source_id'].tolist()
-    source_ids_str = "','".join(source_ids)
-    
-    query = f"""
-    SELECT 
-        s.source_id,
-        s.display_name,
-        s.works_count,
-        s.cited_by_count,
-        s.two_yr_mean_citedness,
-        s.works_ref_year,
-        s.cites_ref_year,
-        s.type,
-        s.publisher,
-        s.country_code,
-        s.issn_l,
-        sjr.quartile,
-        sjr.sjr
-    FROM sources s
-    LEFT JOIN sjr_2024 sjr
-        ON REPLACE(s.issn_l, '-', '') = sjr.issn_norm
-    WHERE s.source_id IN ('{source_ids_str}')
-    """
-    
-    df_sources = pd.read_sql(query, engine)
+    df_sources = fetch_sources(source_ids)
     
     # Merge con candidatos
-    df = df_candidates.merge(df_sources, on='source_id', how='left', suffixes=('_original', ''))
+    # (fetch_sources devuelve una fila por source_id: join many-to-one)
+    df = df_candidates.merge(
+        df_sources, on='source_id', how='left', suffixes=('_original', ''),
+        validate='many_to_one'
+    )
     
-    # Rellenar NaN y manejar display_name correctamente
-    df['works_count'] = df['works_count'].fillna(0)
-    df['cited_by_count'] = df['cited_by_count'].fillna(0)
-    df['two_yr_mean_citedness'] = df['two_yr_mean_citedness'].fillna(0)
-    df['works_ref_year'] = df['works_ref_year'].fillna(0)
-    df['cites_ref_year'] = df['cites_ref_year'].fillna(0)
+    # Rellenar NaN (en una sola pasada, ya con tipos finales) y manejar display_name correctamente
+    numeric_fill_dtypes = {
+        'works_count': 'int64',
+        'cited_by_count': 'int64',
+        'two_yr_mean_citedness': 'float32',
+        'works_ref_year': 'int32',
+        'cites_ref_year': 'int32',
+    }
+    numeric_cols = list(numeric_fill_dtypes)
+    df[numeric_cols] = df[numeric_cols].fillna(0).astype(numeric_fill_dtypes)
     
     # Asegurar display_name: priorizar el de MySQL (sin sufijo), luego el original
     if 'display_name' not in df.columns:
@@ -86,37 +225,30 @@ def calculate_scores(df_candidates):
         df['display_name'] = df['display_name'].fillna(df['display_name_original'])
     df['display_name'] = df['display_name'].fillna('')
     
-    # Normalizar frecuencia (0-1)
-    max_freq = df['freq'].max()
-    df['freq_norm'] = df['freq'] / max_freq if max_freq > 0 else 0
-    
-    # Normalizar two_yr_mean_citedness
-    max_two_yr = df['two_yr_mean_citedness'].max()
-    df['two_yr_norm'] = df['two_yr_mean_citedness'] / max_two_yr if max_two_yr > 0 else 0
-    
-    # Normalizar works_ref_year
-    max_works_ref = df['works_ref_year'].max()
-    df['works_ref_norm'] = df['works_ref_year'] / max_works_ref if max_works_ref > 0 else 0
-    
-    # Normalizar cites_ref_year
-    max_cites_ref = df['cites_ref_year'].max()
-    df['cites_ref_norm'] = df['cites_ref_year'] / max_cites_ref if max_cites_ref > 0 else 0
+    # Columnas enteras para las explicaciones (una sola extracción)
+    freq_arr = df['freq'].fillna(0).to_numpy(np.int64)
+    works_ref_arr = df['works_ref_year'].to_numpy(np.int64)
+    cites_ref_arr = df['cites_ref_year'].to_numpy(np.int64)
     
     # Score final (nueva fórmula: incluye citas del año de referencia)
-    df['score'] = (
-        0.75 * df['freq_norm'] +
-        0.15 * df['two_yr_norm'] +
-        0.05 * df['works_ref_norm'] +
-        0.05 * df['cites_ref_norm']
-    )
+    score = weighted_score([
+        (df[column].to_numpy(np.float32), weight) for column, weight in SCORE_WEIGHTS
+    ])
+    df['score'] = score
     
-    # Generar explicación 'why'
-    df['why'] = df.apply(lambda row: generate_explanation(row), axis=1)
-    
-    # Ordenar por score descendente y asignar rank
-    df = df.sort_values('score', ascending=False)
+    # Ordenar por score descendente: si solo se consumen las top N, seleccionarlas
+    # con argpartition (O(N)) y ordenar solo ese subconjunto
+    if top_n is not None and top_n < len(score) // 2:
+        order = np.argpartition(-score, top_n)[:top_n]
+        order = order[np.argsort(-score[order], kind='stable')]
+    else:
+        order = np.argsort(-score, kind='stable')
+    df = df.iloc[order]
     df['rank_position'] = range(1, len(df) + 1)
     
+    # Generar explicación 'why' (solo para las filas devueltas)
+    df['why'] = generate_explanations(freq_arr[order], works_ref_arr[order], cites_ref_arr[order])
+    
     # Limpiar columnas intermedias
     columns_to_keep = [
         'rank_position', 'source_id', 'display_name', 'score', 'why',
@@ -126,46 +258,51 @@ def calculate_scores(df_candidates):
     ]
     df = df[[col for col in columns_to_keep if col in df.columns]]
     
-    print(f"✅ Scores calculados para {len(df)} revistas")
-    print(f"   Top score: {df['score'].max():.4f}")
-    print(f"   Score promedio: {df['score'].mean():.4f}")
-    print()
+    # max/mean solo se calculan si el nivel DEBUG está activo
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "✅ Scores calculados para %d revistas (top: %.4f, promedio: %.4f)",
+            len(score), score.max(), score.mean()
+        )
     
     return df
 
 
-def generate_explanation(row):
+def generate_explanations(freq_arr, works_ref_arr, cites_ref_arr):
     """
-    Genera una explicación breve del por qué de la recomendación.
+    Genera una explicación breve del por qué de cada recomendación.
     Muestra cuántas veces aparece la revista en los resultados y actividad reciente.
     
+    Construye los textos sobre arrays completos (sin df.apply por fila).
+    
     Args:
-        row (pd.Series): Fila del DataFrame con datos de una revista
+        freq_arr (np.ndarray): Frecuencia de cada revista (int64)
+        works_ref_arr (np.ndarray): Trabajos en el año de referencia (int64)
+        cites_ref_arr (np.ndarray): Citas en el año de referencia (int64)
         
     Returns:
-        str: Texto explicativo con frecuencia y métricas clave
+        np.ndarray: Textos explicativos (dtype object), en el mismo orden
     """
-    freq = int(row.get("freq", 0) or 0)
-    works_ref = int(row.get("works_ref_year", 0) or 0)
-    cites_ref = int(row.get("cites_ref_year", 0) or 0)
+    has_works = works_ref_arr > 0
+    has_cites = cites_ref_arr > 0
     
     # Parte principal: frecuencia
-    if freq == 1:
-        base_text = "Aparece 1 vez en los resultados"
-    else:
-        base_text = f"Aparece {freq} veces en los resultados"
+    base_text = np.where(
+        freq_arr == 1,
+        "Aparece 1 vez en los resultados",
+        np.char.add(np.char.add("Aparece ", freq_arr.astype(str)), " veces en los resultados")
+    )
     
     # Añadir actividad reciente si hay datos
-    activity_parts = []
-    if works_ref > 0:
-        activity_parts.append(f"{works_ref} trabajos (año ref)")
-    if cites_ref > 0:
-        activity_parts.append(f"{cites_ref} citas (año ref)")
-    
-    if activity_parts:
-        return f"{base_text} | {', '.join(activity_parts)}"
-    else:
-        return base_text
+    works_text = np.where(has_works, np.char.add(works_ref_arr.astype(str), " trabajos (año ref)"), "")
+    cites_text = np.where(has_cites, np.char.add(cites_ref_arr.astype(str), " citas (año ref)"), "")
+    separator = np.where(has_works & has_cites, ", ", "")
+    prefix = np.where(has_works | has_cites, " | ", "")
+    
+    why = base_text
+    for part in (prefix, works_text, separator, cites_text):
+        why = np.char.add(why, part)
+    return why.astype(object)
 
 
 def get_top_recommendations(df_ranked, top_n=10):
@@ -5,6 +5,7 @@ import pandas as pd
 from datetime import datetime
 import sys
 import os
+import logging
 from sqlalchemy import text
 
 # Agregar el directorio raíz al path
@@ -12,6 +13,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.connection import get_engine
 
+logger = logging.getLogger(__name__)
+
 
 def save_query_and_recommendations(query_text, df_ranked):
     """
@@ -28,13 +31,14 @@ def save_query_and_recommendations(query_text, df_ranked):
         Exception: Si falla el guardado
     """
     if df_ranked.empty:
-        print("⚠️  No hay recomendaciones para guardar")
+        logger.warning("⚠️  No hay recomendaciones para guardar")
         return None
     
-    print("Guardando recomendaciones en MySQL...")
-    print("-" * 70)
+    logger.debug("Guardando recomendaciones en MySQL...")
     
     engine = get_engine()
+    # Una sola marca de tiempo para la query y todas sus recomendaciones
+    now = datetime.utcnow()
     
     try:
         with engine.begin() as conn:
@@ -45,47 +49,47 @@ def save_query_and_recommendations(query_text, df_ranked):
             """)
             result = conn.execute(
                 insert_query_sql,
-                {'query_text': query_text, 'created_at': datetime.utcnow()}
+                {'query_text': query_text, 'created_at': now}
             )
             query_id = result.lastrowid
             
-            print(f"✅ Query guardada con ID: {query_id}")
+            logger.debug("✅ Query guardada con ID: %s", query_id)
             
-            # 2. Borrar recomendaciones previas de esta query (por si existe)
-            conn.execute(
-                text("DELETE FROM recommendations WHERE query_id = :qid"),
-                {"qid": query_id}
-            )
+            # 2. Preparar recomendaciones (columnas completas, sin iterrows)
+            source_ids = df_ranked['source_id'].tolist()
+            ranks = df_ranked['rank_position'].astype(int).tolist()
+            scores = df_ranked['score'].astype(float).tolist()
+            if 'why' in df_ranked.columns:
+                whys = df_ranked['why'].fillna('').str.slice(0, 1000).tolist()  # Limitar texto
+            else:
+                whys = [''] * len(source_ids)
             
-            # 3. Preparar recomendaciones
-            recommendations = []
-            for _, row in df_ranked.iterrows():
-                rec = {
+            recommendations = [
+                {
                     'query_id': query_id,
-                    'source_id': row['source_id'],
-                    'rank_position': int(row['rank_position']),
-                    'score': float(row['score']),
-                    'why': row.get('why', '')[:1000],  # Limitar texto
-                    'created_at': datetime.utcnow()
+                    'source_id': source_id,
+                    'rank_position': rank,
+                    'score': score,
+                    'why': why,
+                    'created_at': now
                 }
-                recommendations.append(rec)
+                for source_id, rank, score, why in zip(source_ids, ranks, scores, whys)
+            ]
             
-            # 4. Insertar recomendaciones una a una (más estable)
+            # 3. Insertar recomendaciones en un único executemany
             insert_sql = text("""
             INSERT INTO recommendations (query_id, source_id, rank_position, score, why, created_at)
             VALUES (:query_id, :source_id, :rank_position, :score, :why, :created_at)
             """)
             
-            for rec in recommendations:
-                conn.execute(insert_sql, rec)
+            conn.execute(insert_sql, recommendations)
             
-            print(f"✅ {len(recommendations)} recomendaciones guardadas")
-            print()
+            logger.debug("✅ %d recomendaciones guardadas", len(recommendations))
             
             return query_id
             
     except Exception as e:
-        print(f"❌ Error al guardar recomendaciones: {e}")
+        logger.error("❌ Error al guardar recomendaciones: %s", e)
         raise
 
 
@@ -101,18 +105,26 @@ def get_query_history(limit=10):
     """
     engine = get_engine()
     
-    query = text(f"""
+    # Primero las últimas N queries y después un único JOIN + GROUP BY
+    # (en lugar de una subconsulta COUNT(*) por fila)
+    query = text("""
     SELECT 
-        query_id,
-        query_text,
-        created_at,
-        (SELECT COUNT(*) FROM recommendations WHERE query_id = q.query_id) as num_recommendations
-    FROM query_runs q
-    ORDER BY created_at DESC
-    LIMIT {limit}
+        q.query_id,
+        q.query_text,
+        q.created_at,
+        COUNT(r.query_id) as num_recommendations
+    FROM (
+        SELECT query_id, query_text, created_at
+        FROM query_runs
+        ORDER BY created_at DESC
+        LIMIT :limit
+    ) q
+    LEFT JOIN recommendations r ON r.query_id = q.query_id
+    GROUP BY q.query_id, q.query_text, q.created_at
+    ORDER BY q.created_at DESC
     """)
     
-    df = pd.read_sql(query, engine)
+    df = pd.read_sql(query, engine, params={'limit': int(limit)})
     return df
 
 
@@ -128,7 +140,7 @@ def get_recommendations_by_query(query_id):
     """
     engine = get_engine()
     
-    query = text(f"""
+    query = text("""
     SELECT 
         r.rank_position,
         r.source_id,
@@ -142,11 +154,11 @@ def get_recommendations_by_query(query_id):
         r.created_at
     FROM recommendations r
     LEFT JOIN sources s ON r.source_id = s.source_id
-    WHERE r.query_id = {query_id}
+    WHERE r.query_id = :qid
     ORDER BY r.rank_position ASC
     """)
     
-    df = pd.read_sql(query, engine)
+    df = pd.read_sql(query, engine, params={'qid': int(query_id)})
     return df
 
 
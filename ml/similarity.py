@@ -3,12 +3,14 @@ Módulo para calcular similitud entre revistas basado en perfiles numéricos.
 """
 import pandas as pd
 import numpy as np
-import json
+import pickle
+import re
+import threading
+import time
+import orjson
 import requests
 from datetime import datetime
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 import sys
 import os
 
@@ -16,8 +18,42 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.connection import get_engine
+from etl.load_openalex import build_source_row, upsert_sources
+from etl.openalex_client import search_sources, get_source_by_issn
 import config
 
+# Features numéricas usadas para la similitud de perfil
+FEATURE_COLS = [
+    'two_yr_mean_citedness',
+    'works_ref_year',
+    'cites_ref_year',
+    'works_count',
+    'cited_by_count'
+]
+
+# Caracteres que no forman parte de un ISSN normalizado
+_ISSN_RE = re.compile(r'[^0-9X]')
+
+# Operadores de MATCH ... AGAINST en BOOLEAN MODE (se eliminan del texto del usuario)
+_FULLTEXT_OPERATORS_RE = re.compile(r'[+\-<>()~*"@]+')
+
+# Palabras más cortas que innodb_ft_min_token_size (3 por defecto) no están en el índice
+_FULLTEXT_MIN_WORD_LEN = 3
+
+# Error de MySQL ER_FT_MATCHING_KEY_NOT_FOUND: no hay índice FULLTEXT para el MATCH
+_MYSQL_ERR_NO_FULLTEXT_INDEX = 1191
+
+# Versión del formato de la caché de similitud en disco (subir si cambia su contenido)
+SIMILARITY_CACHE_VERSION = 4
+
+# Caché de similitud (matriz normalizada + topics) ya cargada en este proceso
+_similarity_cache = None
+_similarity_cache_lock = threading.Lock()
+
+# Última clave de validez calculada: (expira_en, clave). Evita recorrer sources
+# con COUNT/MAX en cada búsqueda de similares
+_similarity_key_memo = None
+
 
 def search_openalex_sources(filter_param=None, search_param=None, per_page=20):
     """
@@ -32,27 +68,40 @@ def search_openalex_sources(filter_param=None, search_param=None, per_page=20):
         list: Lista de sources encontrados
     """
     try:
-        base_url = config.OPENALEX_BASE_URL
-        email = config.OPENALEX_EMAIL
-        url = f"{base_url}/sources"
-        
-        params = {'per-page': per_page}
-        if email:
-            params['mailto'] = email
-        if filter_param:
-            params['filter'] = filter_param
-        if search_param:
-            params['search'] = search_param
-        
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        return data.get('results', [])
+        # Cliente compartido del ETL: mismo pool keep-alive, backoff y límites de Retry-After
+        return search_sources(search_param=search_param, filter_param=filter_param, per_page=per_page)
     except Exception as e:
         print(f"  ⚠️  Error buscando en OpenAlex: {e}")
         return []
 
 
+def upsert_sources_to_mysql_batch(sources_data):
+    """
+    Guarda o actualiza varios sources en MySQL en una sola transacción.
+    
+    Args:
+        sources_data (list): Sources desde OpenAlex
+        
+    Returns:
+        int: Número de sources guardados
+    """
+    ref_year = datetime.utcnow().year - 4
+    source_rows = [
+        row for row in (build_source_row(source_data, ref_year) for source_data in sources_data)
+        if row
+    ]
+    if not source_rows:
+        return 0
+    
+    try:
+        upsert_sources(get_engine(), source_rows)
+        invalidate_similarity_cache_key()
+        return len(source_rows)
+    except Exception as e:
+        print(f"  ⚠️  Error guardando sources en MySQL: {e}")
+        return 0
+
+
 def upsert_source_to_mysql(source_data):
     """
     Guarda o actualiza un source en MySQL.
@@ -63,96 +112,7 @@ def upsert_source_to_mysql(source_data):
     Returns:
         bool: True si se guardó exitosamente
     """
-    try:
-        engine = get_engine()
-        
-        # Extraer datos
-        source_id = source_data.get('id', '').split('/')[-1]
-        if not source_id:
-            return False
-        
-        # Calcular año de referencia
-        ref_year = datetime.utcnow().year - 4
-        
-        # Buscar datos del año de referencia
-        works_ref_year = 0
-        cites_ref_year = 0
-        for year_entry in source_data.get('counts_by_year', []):
-            if year_entry.get('year') == ref_year:
-                works_ref_year = year_entry.get('works_count', 0) or 0
-                cites_ref_year = year_entry.get('cited_by_count', 0) or 0
-                break
-        
-        # Extraer métricas
-        two_yr_mean_citedness = source_data.get('summary_stats', {}).get('2yr_mean_citedness', None)
-        
-        # Extraer topics
-        topics = source_data.get("topics", []) or source_data.get("topic_share", []) or []
-        topics_json = json.dumps(topics) if topics else None
-        
-        # Preparar datos
-        source_row = {
-            'source_id': source_id,
-            'display_name': source_data.get('display_name', ''),
-            'issn_l': source_data.get('issn_l', None),
-            'country_code': source_data.get('country_code', None),
-            'publisher': source_data.get('host_organization_name', None),
-            'type': source_data.get('type', None),
-            'works_count': source_data.get('works_count', 0),
-            'cited_by_count': source_data.get('cited_by_count', 0),
-            'ref_year': ref_year,
-            'two_yr_mean_citedness': two_yr_mean_citedness,
-            'works_ref_year': works_ref_year,
-            'cites_ref_year': cites_ref_year,
-            'topics_json': topics_json,
-        }
-        
-        # UPSERT usando INSERT ... ON DUPLICATE KEY UPDATE
-        with engine.begin() as conn:
-            # Intentar INSERT primero
-            try:
-                df_source = pd.DataFrame([source_row])
-                df_source.to_sql('sources', engine, if_exists='append', index=False, method='multi')
-            except:
-                # Si falla por duplicado, hacer UPDATE
-                update_sql = text("""
-                UPDATE sources SET
-                    display_name = :display_name,
-                    issn_l = :issn_l,
-                    country_code = :country_code,
-                    publisher = :publisher,
-                    type = :type_val,
-                    works_count = :works_count,
-                    cited_by_count = :cited_by_count,
-                    ref_year = :ref_year,
-                    works_ref_year = :works_ref_year,
-                    cites_ref_year = :cites_ref_year,
-                    two_yr_mean_citedness = :two_yr_mean_citedness,
-                    topics_json = :topics_json,
-                    updated_date = NOW()
-                WHERE source_id = :source_id
-                """)
-                
-                conn.execute(update_sql, {
-                    'display_name': source_row['display_name'],
-                    'issn_l': source_row['issn_l'],
-                    'country_code': source_row['country_code'],
-                    'publisher': source_row['publisher'],
-                    'type_val': source_row['type'],
-                    'works_count': source_row['works_count'],
-                    'cited_by_count': source_row['cited_by_count'],
-                    'ref_year': source_row['ref_year'],
-                    'works_ref_year': source_row['works_ref_year'],
-                    'cites_ref_year': source_row['cites_ref_year'],
-                    'two_yr_mean_citedness': source_row['two_yr_mean_citedness'],
-                    'topics_json': source_row['topics_json'],
-                    'source_id': source_id
-                })
-        
-        return True
-    except Exception as e:
-        print(f"  ⚠️  Error guardando source en MySQL: {e}")
-        return False
+    return upsert_sources_to_mysql_batch([source_data]) == 1
 
 
 def extract_top_topics(topics_json, top_k=10):
@@ -164,50 +124,231 @@ def extract_top_topics(topics_json, top_k=10):
         top_k (int): Número de topics a extraer
         
     Returns:
-        set: Conjunto de topic IDs (ej: {'T10521', 'T11234'})
+        frozenset: Conjunto de topic IDs numéricos (ej: {10521, 11234})
     """
     if not topics_json or pd.isna(topics_json):
-        return set()
+        return frozenset()
     
     try:
-        topics = json.loads(topics_json)
+        topics = orjson.loads(topics_json)
         if not isinstance(topics, list):
-            return set()
+            return frozenset()
         
-        # Extraer IDs de topics (formato: "https://openalex.org/T10521" -> "T10521")
+        # Extraer IDs de topics como enteros (formato: "https://openalex.org/T10521" -> 10521);
+        # las operaciones de conjuntos sobre ints son más baratas que sobre strings
         topic_ids = set()
         for topic in topics[:top_k]:
             if isinstance(topic, dict):
                 topic_id = topic.get('id', '')
                 if topic_id:
                     # Extraer parte final del URL
-                    topic_id = topic_id.split('/')[-1]
-                    if topic_id.startswith('T'):
-                        topic_ids.add(topic_id)
+                    topic_id = topic_id.rpartition('/')[2]
+                    if topic_id.startswith('T') and topic_id[1:].isdigit():
+                        topic_ids.add(int(topic_id[1:]))
         
-        return topic_ids
-    except (json.JSONDecodeError, TypeError, AttributeError):
-        return set()
+        return frozenset(topic_ids)
+    except (orjson.JSONDecodeError, TypeError, AttributeError):
+        return frozenset()
 
 
-def jaccard_similarity(set1, set2):
+def _pack_topic_matrix(topics_values, top_k=10):
     """
-    Calcula la similitud de Jaccard entre dos conjuntos.
+    Empaqueta los top K topics de cada revista en una matriz int32 de ancho fijo.
     
     Args:
-        set1 (set): Primer conjunto
-        set2 (set): Segundo conjunto
+        topics_values (list): JSON strings de topics (uno por revista)
+        top_k (int): Número de topics a extraer por fila
         
     Returns:
-        float: Similitud Jaccard (0.0 a 1.0)
+        tuple: (np.ndarray int32 [N, top_k] con -1 en huecos, np.ndarray con el nº de topics de cada fila)
+    """
+    topic_matrix = np.full((len(topics_values), top_k), -1, dtype=np.int32)
+    topic_lens = np.zeros(len(topics_values), dtype=np.int32)
+    for i, topics_json in enumerate(topics_values):
+        topic_ids = extract_top_topics(topics_json, top_k=top_k)
+        topic_matrix[i, :len(topic_ids)] = sorted(topic_ids)
+        topic_lens[i] = len(topic_ids)
+    return topic_matrix, topic_lens
+
+
+def _similarity_cache_key(engine, refresh=False):
     """
-    if not set1 or not set2:
-        return 0.0
+    Calcula la huella de los datos de los que depende la caché de similitud.
     
-    intersection = len(set1 & set2)
-    union = len(set1 | set2)
+    La clave se reutiliza durante config.SIMILARITY_CACHE_KEY_TTL segundos: los
+    cambios hechos por otros procesos (ETL) tardan como mucho eso en verse, y
+    las escrituras de este proceso la invalidan al momento (ver
+    invalidate_similarity_cache_key).
     
-    return intersection / union if union > 0 else 0.0
+    Args:
+        engine: SQLAlchemy engine
+        refresh (bool): Si True, ignora la clave memorizada y consulta MySQL
+        
+    Returns:
+        str: Clave que cambia si se añaden o actualizan sources o cambia el
+            formato de la caché
+    """
+    global _similarity_key_memo
+    memo = _similarity_key_memo
+    if not refresh and memo is not None and memo[0] > time.monotonic():
+        return memo[1]
+    
+    # last_seen_at lo mantiene MySQL (ON UPDATE CURRENT_TIMESTAMP) con su propio
+    # reloj en cualquier cambio de fila, también en los que no tocan updated_date
+    with engine.connect() as conn:
+        count, last_update = conn.execute(
+            text("SELECT COUNT(*), MAX(last_seen_at) FROM sources")
+        ).one()
+    key = f"v{SIMILARITY_CACHE_VERSION}|{count}|{last_update}"
+    _similarity_key_memo = (time.monotonic() + config.SIMILARITY_CACHE_KEY_TTL, key)
+    return key
+
+
+def invalidate_similarity_cache_key():
+    """
+    Olvida la clave memorizada de la caché de similitud tras escribir en sources,
+    para que la siguiente búsqueda compruebe los datos actuales.
+    """
+    global _similarity_key_memo
+    _similarity_key_memo = None
+
+
+def _build_similarity_cache(engine, key):
+    """
+    Construye la caché de similitud y la guarda en disco.
+    
+    Lee una vez solo las columnas necesarias para la similitud (features y
+    topics) con un cursor en streaming por lotes, normaliza las features (z-score + norma
+    L2) y extrae los topics de cada revista. La matriz se guarda en .npy (se
+    abre memory-mapped) junto a la matriz de topics, y el resto (IDs, clave)
+    en un pickle.
+    
+    Args:
+        engine: SQLAlchemy engine
+        key (str): Clave de validez (ver _similarity_cache_key)
+        
+    Returns:
+        dict: Caché con 'key', 'source_ids', 'features', 'topic_matrix', 'topic_lens'
+    """
+    print("  🧮 Construyendo caché de similitud...")
+    query_all = text(f"""
+    SELECT source_id, {', '.join(FEATURE_COLS)}, topics_json
+    FROM sources
+    """)
+    n_features = len(FEATURE_COLS)
+    source_ids = []
+    topics_values = []
+    feature_blocks = []
+    
+    # Cursor en streaming (lado servidor): cada lote se convierte a un bloque
+    # float32 y se descarta, sin materializar antes todas las filas como tuplas
+    with engine.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True,
+            yield_per=config.DB_STREAM_BATCH_SIZE
+        ).execute(query_all)
+        for part in result.partitions():
+            source_ids.extend(row[0] for row in part)
+            topics_values.extend(row[-1] for row in part)
+            feature_blocks.append(np.array(
+                [row[1:1 + n_features] for row in part], dtype=np.float32
+            ).reshape(len(part), n_features))
+    
+    # Normalizar features (z-score, NULL como 0) y a norma L2 unitaria
+    if feature_blocks:
+        features = np.concatenate(feature_blocks)
+    else:
+        features = np.empty((0, n_features), dtype=np.float32)
+    del feature_blocks
+    # (todo in-place sobre la única matriz float32, sin copias intermedias)
+    np.nan_to_num(features, copy=False)
+    mu = features.mean(axis=0) if len(features) else np.zeros(n_features, dtype=np.float32)
+    sd = features.std(axis=0) if len(features) else np.ones(n_features, dtype=np.float32)
+    sd[sd == 0] = 1
+    features -= mu
+    features /= sd
+    
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    features /= norms
+    # Matriz C-contigua float32: el producto matriz-vector va directo a BLAS (sgemv)
+    features = np.ascontiguousarray(features, dtype=np.float32)
+    
+    topic_matrix, topic_lens = _pack_topic_matrix(topics_values, top_k=10)
+    
+    # Guardar en disco (escritura atómica: primero a .tmp y luego replace)
+    cache_dir = config.SIMILARITY_CACHE_DIR
+    if cache_dir:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            features_path = os.path.join(cache_dir, 'sim_features.npy')
+            topics_path = os.path.join(cache_dir, 'sim_topics.npy')
+            meta_path = os.path.join(cache_dir, 'sim_meta.pkl')
+            with open(features_path + '.tmp', 'wb') as f:
+                np.save(f, features)
+            with open(topics_path + '.tmp', 'wb') as f:
+                np.save(f, topic_matrix)
+            with open(meta_path + '.tmp', 'wb') as f:
+                pickle.dump(
+                    {'key': key, 'source_ids': source_ids, 'topic_lens': topic_lens},
+                    f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(features_path + '.tmp', features_path)
+            os.replace(topics_path + '.tmp', topics_path)
+            os.replace(meta_path + '.tmp', meta_path)
+        except OSError as e:
+            print(f"  ⚠️  No se pudo guardar la caché de similitud: {e}")
+    
+    return {
+        'key': key,
+        'source_ids': source_ids,
+        'features': features,
+        'topic_matrix': topic_matrix,
+        'topic_lens': topic_lens,
+    }
+
+
+def _load_similarity_cache(engine, refresh_key=False):
+    """
+    Devuelve la caché de similitud vigente (memoria → disco → reconstrucción).
+    
+    Args:
+        engine: SQLAlchemy engine
+        refresh_key (bool): Si True, recalcula la clave de validez (ver _similarity_cache_key)
+        
+    Returns:
+        dict: Caché (ver _build_similarity_cache) con 'positions' (source_id -> fila)
+    """
+    global _similarity_cache
+    key = _similarity_cache_key(engine, refresh=refresh_key)
+    
+    with _similarity_cache_lock:
+        if _similarity_cache is not None and _similarity_cache['key'] == key:
+            return _similarity_cache
+        
+        cache = None
+        cache_dir = config.SIMILARITY_CACHE_DIR
+        if cache_dir:
+            meta_path = os.path.join(cache_dir, 'sim_meta.pkl')
+            features_path = os.path.join(cache_dir, 'sim_features.npy')
+            topics_path = os.path.join(cache_dir, 'sim_topics.npy')
+            try:
+                with open(meta_path, 'rb') as f:
+                    meta = pickle.load(f)
+                if meta.get('key') == key:
+                    meta['features'] = np.load(features_path, mmap_mode='r')
+                    meta['topic_matrix'] = np.load(topics_path, mmap_mode='r')
+                    cache = meta
+            except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+                cache = None
+        
+        if cache is None:
+            cache = _build_similarity_cache(engine, key)
+        
+        cache['positions'] = {sid: pos for pos, sid in enumerate(cache['source_ids'])}
+        
+        _similarity_cache = cache
+        return cache
 
 
 def find_similar_sources(source_id, top_n=10, use_thematic=False):
@@ -250,36 +391,73 @@ def find_similar_sources(source_id, top_n=10, use_thematic=False):
     
     engine = get_engine()
     
-    # 1. Obtener datos de la revista de referencia
-    query_ref = """
-    SELECT 
-        s.source_id,
-        s.display_name,
-        s.two_yr_mean_citedness,
-        s.works_ref_year,
-        s.cites_ref_year,
-        s.works_count,
-        s.cited_by_count,
-        s.type,
-        s.publisher,
-        s.country_code,
-        s.issn_l,
-        s.topics_json,
-        sjr.quartile,
-        sjr.sjr
-    FROM sources s
-    LEFT JOIN sjr_2024 sjr
-        ON REPLACE(s.issn_l, '-', '') = sjr.issn_norm
-    WHERE s.source_id = %s
-    """
+    # 1-2. Matriz de features normalizada y topics de todas las revistas
+    # (caché en memoria/disco, se reconstruye si cambian los sources)
+    cache = _load_similarity_cache(engine)
+    features = cache['features']
+    
+    ref_pos = cache['positions'].get(source_id)
+    if ref_pos is None:
+        # Puede ser una revista añadida después de memorizar la clave: se
+        # comprueba contra los datos actuales antes de darla por inexistente
+        cache = _load_similarity_cache(engine, refresh_key=True)
+        features = cache['features']
+        ref_pos = cache['positions'].get(source_id)
+    if ref_pos is None:
+        raise ValueError(f"No se encontró la revista con source_id: {source_id}")
+    
+    if len(cache['source_ids']) < 2:
+        print("⚠️  No hay otras revistas en la base de datos para comparar")
+        return pd.DataFrame(columns=['source_id', 'display_name', 'similarity', 'why'])
     
-    df_ref = pd.read_sql(query_ref, engine, params=(source_id,))
+    # 3-5. Similitud de coseno: producto escalar de la referencia contra todas
+    # las filas (ya normalizadas con z-score y norma L2 en la caché); un único
+    # sgemv sobre la matriz float32 memory-mapped
+    ref_vector = np.ascontiguousarray(features[ref_pos], dtype=np.float32)
+    similarities = features @ ref_vector
     
-    if df_ref.empty:
-        raise ValueError(f"No se encontró la revista con source_id: {source_id}")
+    # Topics de la referencia (una sola vez para el ranking y las explicaciones);
+    # la caché los guarda empaquetados en una matriz int32 (-1 = hueco)
+    topic_lens = cache['topic_lens']
+    ref_len = int(topic_lens[ref_pos])
     
-    # 2. Obtener todas las revistas para comparación
-    query_all = """
+    # 6. Calcular similitud temática si está activada
+    if use_thematic:
+        if ref_len > 0:
+            topic_matrix = cache['topic_matrix']
+            ref_topics = topic_matrix[ref_pos, :ref_len]
+            
+            # Similitud Jaccard para todas las revistas: |A∩B| / (|A| + |B| - |A∩B|);
+            # la intersección se cuenta sobre la matriz completa de una vez
+            inters = np.isin(topic_matrix, ref_topics).sum(axis=1, dtype=np.int32)
+            unions = ref_len + topic_lens - inters
+            thematic_sims = np.divide(inters, unions, out=np.zeros(len(inters)), where=unions > 0)
+        else:
+            # Sin topics en la referencia todas las Jaccard valen 0
+            inters = np.zeros(len(similarities), dtype=np.int32)
+            thematic_sims = np.zeros(len(similarities))
+        
+        # Combinar similitudes: 70% numérica + 30% temática
+        ranking = 0.7 * similarities + 0.3 * thematic_sims
+    else:
+        # Solo similitud numérica
+        ranking = similarities.copy()
+    
+    # La referencia nunca es candidata
+    ranking[ref_pos] = -np.inf
+    
+    # 7. Seleccionar top N por similitud descendente: argpartition (O(N)) y
+    # ordenar solo las elegidas
+    k = min(top_n, len(ranking) - 1)
+    if k > 0:
+        top_idx = np.argpartition(-ranking, k - 1)[:k]
+    else:
+        top_idx = np.arange(0)
+    top_idx = top_idx[np.argsort(-ranking[top_idx], kind='stable')]
+    
+    # Datos de presentación (incluye SJR) solo para las revistas elegidas
+    top_ids = [cache['source_ids'][i] for i in top_idx]
+    query_top = text("""
     SELECT 
         s.source_id,
         s.display_name,
@@ -292,102 +470,45 @@ def find_similar_sources(source_id, top_n=10, use_thematic=False):
         s.publisher,
         s.country_code,
         s.issn_l,
-        s.topics_json,
         sjr.quartile,
         sjr.sjr
     FROM sources s
     LEFT JOIN sjr_2024 sjr
         ON REPLACE(s.issn_l, '-', '') = sjr.issn_norm
-    WHERE s.source_id != %s
-    """
-    
-    df_all = pd.read_sql(query_all, engine, params=(source_id,))
-    
-    if df_all.empty:
-        print("⚠️  No hay otras revistas en la base de datos para comparar")
-        return pd.DataFrame(columns=['source_id', 'display_name', 'similarity', 'why'])
-    
-    # 3. Definir features para similitud
-    feature_cols = [
-        'two_yr_mean_citedness',
-        'works_ref_year',
-        'cites_ref_year',
-        'works_count',
-        'cited_by_count'
-    ]
-    
-    # Combinar ref + all para normalizar juntos
-    df_combined = pd.concat([df_ref, df_all], ignore_index=True)
-    
-    # Rellenar NaN con 0
-    for col in feature_cols:
-        df_combined[col] = df_combined[col].fillna(0)
-    
-    # 4. Normalizar features (z-score)
-    scaler = StandardScaler()
-    features_normalized = scaler.fit_transform(df_combined[feature_cols])
-    
-    # Separar ref de las demás
-    ref_features = features_normalized[0:1]  # Primera fila (la referencia)
-    all_features = features_normalized[1:]   # Resto
-    
-    # 5. Calcular similitud de coseno
-    similarities = cosine_similarity(ref_features, all_features)[0]
-    
-    # 6. Añadir similitudes al DataFrame
-    df_all['numeric_similarity'] = similarities
+    WHERE s.source_id IN :ids
+    """).bindparams(bindparam('ids', expanding=True))
+    df_top = pd.read_sql(query_top, engine, params={'ids': top_ids})
+    df_similar = (
+        df_top.drop_duplicates('source_id')
+        .set_index('source_id')
+        .reindex(top_ids)  # Mismo orden que el ranking
+        .reset_index()
+    )
     
-    # 7. Calcular similitud temática si está activada
+    # Añadir similitudes solo a las filas seleccionadas
+    df_similar['numeric_similarity'] = similarities[top_idx]
+    df_similar['similarity_score'] = similarities[top_idx]  # Similitud numérica base
     if use_thematic:
-        # Extraer topics de la referencia
-        ref_topics = extract_top_topics(df_ref.iloc[0]['topics_json'], top_k=10)
-        
-        # Calcular similitud Jaccard para cada revista
-        thematic_sims = []
-        topic_overlaps = []
-        for idx, row in df_all.iterrows():
-            candidate_topics = extract_top_topics(row['topics_json'], top_k=10)
-            jaccard_sim = jaccard_similarity(ref_topics, candidate_topics)
-            thematic_sims.append(jaccard_sim)
-            
-            # Guardar overlap para explicación
-            overlap = len(ref_topics & candidate_topics)
-            topic_overlaps.append(overlap)
-        
-        df_all['thematic_similarity'] = thematic_sims
-        df_all['topic_overlap'] = topic_overlaps
-        
-        # Guardar similitud numérica base
-        df_all['similarity_score'] = df_all['numeric_similarity']
-        
-        # Combinar similitudes: 70% numérica + 30% temática
-        df_all['final_similarity'] = 0.7 * df_all['numeric_similarity'] + 0.3 * df_all['thematic_similarity']
-        
-        # Ordenar por similitud final
-        sort_column = 'final_similarity'
+        df_similar['thematic_similarity'] = thematic_sims[top_idx]
+        df_similar['final_similarity'] = ranking[top_idx]
+        df_similar['topic_overlap'] = inters[top_idx]
     else:
-        # Solo similitud numérica
-        df_all['similarity_score'] = df_all['numeric_similarity']
-        df_all['thematic_similarity'] = None
-        df_all['final_similarity'] = None
-        df_all['topic_overlap'] = 0
-        
-        # Ordenar por similitud numérica
-        sort_column = 'similarity_score'
-    
-    # 8. Ordenar por similitud descendente
-    df_similar = df_all.sort_values(sort_column, ascending=False).head(top_n)
+        df_similar['thematic_similarity'] = None
+        df_similar['final_similarity'] = None
+        df_similar['topic_overlap'] = 0
     
     # Mantener columna 'similarity' para compatibilidad
-    df_similar['similarity'] = df_similar[sort_column]
-    
-    # 8. Generar explicación
-    ref_row = df_ref.iloc[0]
-    ref_topics_for_explain = extract_top_topics(ref_row['topics_json'], top_k=10)
-    df_similar['why'] = df_similar.apply(
-        lambda row: generate_similarity_explanation(row, ref_row, use_thematic, ref_topics_for_explain), 
-        axis=1
-    )
+    df_similar['similarity'] = ranking[top_idx]
+    
+    # 8. Generar explicación (lista por comprensión, sin apply por fila)
+    base_why = "Perfil numérico similar (impacto y actividad recientes)"
+    if use_thematic and ref_len > 0:
+        df_similar['why'] = [
+            f"{base_why}. Comparten {overlap}/{ref_len} topics principales" if overlap > 0 else base_why
+            for overlap in df_similar['topic_overlap'].tolist()
+        ]
+    else:
+        df_similar['why'] = base_why
     
     # 9. Seleccionar columnas finales
     base_columns = [
@@ -415,28 +536,6 @@ def find_similar_sources(source_id, top_n=10, use_thematic=False):
     return result
 
 
-def generate_similarity_explanation(row, ref_row, use_thematic=False, ref_topics=None):
-    """
-    Genera explicación basada en similitud de perfil numérico y/o temático.
-    
-    Args:
-        row (pd.Series): Revista candidata similar
-        ref_row (pd.Series): Revista de referencia
-        use_thematic (bool): Si se usó similitud temática
-        ref_topics (set): Topics de la revista de referencia
-        
-    Returns:
-        str: Texto explicativo de la similitud
-    """
-    if use_thematic and 'topic_overlap' in row and ref_topics:
-        overlap = int(row.get('topic_overlap', 0))
-        total_topics = len(ref_topics)
-        if overlap > 0 and total_topics > 0:
-            return f"Perfil numérico similar (impacto y actividad recientes). Comparten {overlap}/{total_topics} topics principales"
-    
-    return "Perfil numérico similar (impacto y actividad recientes)"
-
-
 def search_sources_by_issn(issn):
     """
     Busca revistas por ISSN-L. Si no encuentra en MySQL, busca en OpenAlex.
@@ -450,7 +549,7 @@ def search_sources_by_issn(issn):
     engine = get_engine()
     
     # Normalizar ISSN: extraer solo dígitos y X
-    issn_clean = ''.join(c for c in issn.upper() if c.isdigit() or c == 'X')
+    issn_clean = _ISSN_RE.sub('', issn.upper())
     
     # Si tiene 8 caracteres, formatear como XXXX-XXXX para OpenAlex
     if len(issn_clean) == 8:
@@ -492,31 +591,19 @@ def search_sources_by_issn(issn):
     print(f"  🌐 Consultando OpenAlex: /sources/issn:{issn_dash}")
     
     try:
-        base_url = config.OPENALEX_BASE_URL
-        email = config.OPENALEX_EMAIL
-        
-        # Usar endpoint directo: /sources/issn:XXXX-XXXX
-        url = f"{base_url}/sources/issn:{issn_dash}"
-        
-        params = {}
-        if email:
-            params['mailto'] = email
-        
-        response = requests.get(url, params=params, timeout=30)
-        
-        # Manejar diferentes status codes
-        if response.status_code == 404:
-            print(f"  ❌ ISSN {issn_dash} no encontrado en OpenAlex (404)")
+        # Endpoint directo /sources/issn:XXXX-XXXX con el cliente compartido del ETL
+        # (los status transitorios ya se han reintentado)
+        try:
+            source_data = get_source_by_issn(issn_dash)
+        except requests.exceptions.HTTPError as e:
+            print(f"  ❌ Error HTTP {e.response.status_code} desde OpenAlex")
+            print(f"  Response body: {e.response.text[:500]}")
             return pd.DataFrame()
         
-        if response.status_code != 200:
-            print(f"  ❌ Error HTTP {response.status_code} desde OpenAlex")
-            print(f"  Response body: {response.text[:500]}")
+        if source_data is None:
+            print(f"  ❌ ISSN {issn_dash} no encontrado en OpenAlex (404)")
             return pd.DataFrame()
         
-        # Respuesta 200: parsear el source
-        source_data = response.json()
-        
         if not source_data or not source_data.get('id'):
             print(f"  ❌ OpenAlex devolvió respuesta vacía para ISSN {issn_dash}")
             return pd.DataFrame()
@@ -555,6 +642,39 @@ def search_sources_by_issn(issn):
     return df
 
 
+def _fulltext_boolean_terms(name):
+    """
+    Convierte un texto libre en una expresión MATCH ... AGAINST en BOOLEAN MODE.
+    
+    Cada palabra pasa a ser obligatoria y con búsqueda por prefijo ("+palabra*"),
+    lo más parecido al LIKE '%texto%' que permite el índice FULLTEXT. Las palabras
+    demasiado cortas para estar en el índice se descartan.
+    
+    Args:
+        name (str): Texto a buscar
+        
+    Returns:
+        str: Expresión booleana, o cadena vacía si no queda ninguna palabra
+    """
+    words = _FULLTEXT_OPERATORS_RE.sub(' ', name).split()
+    return ' '.join(f'+{word}*' for word in words if len(word) >= _FULLTEXT_MIN_WORD_LEN)
+
+
+def _is_missing_fulltext_index(exc):
+    """
+    Indica si un error de MySQL se debe a que falta el índice FULLTEXT (error 1191).
+    
+    Args:
+        exc (Exception): Excepción lanzada por la consulta (SQLAlchemy o PyMySQL)
+        
+    Returns:
+        bool: True si la tabla no tiene índice FULLTEXT para el MATCH
+    """
+    orig = getattr(exc, 'orig', exc)
+    args = getattr(orig, 'args', ())
+    return bool(args) and args[0] == _MYSQL_ERR_NO_FULLTEXT_INDEX
+
+
 def search_sources_by_name(name, limit=20):
     """
     Busca revistas por nombre (búsqueda parcial). Si no encuentra en MySQL, busca en OpenAlex.
@@ -568,8 +688,7 @@ def search_sources_by_name(name, limit=20):
     """
     engine = get_engine()
     
-    # Búsqueda case-insensitive con LIKE
-    query = f"""
+    base_query = """
     SELECT 
         s.source_id,
         s.display_name,
@@ -585,13 +704,31 @@ def search_sources_by_name(name, limit=20):
     FROM sources s
     LEFT JOIN sjr_2024 sjr
         ON REPLACE(s.issn_l, '-', '') = sjr.issn_norm
-    WHERE LOWER(s.display_name) LIKE LOWER(%s)
+    WHERE {where}
     ORDER BY s.works_count DESC
-    LIMIT {limit}
+    LIMIT %s
     """
     
+    # Búsqueda indexada con el FULLTEXT ft_display_name (todas las palabras, por prefijo)
+    fulltext_query = base_query.format(where="MATCH(s.display_name) AGAINST(%s IN BOOLEAN MODE)")
+    fulltext_terms = _fulltext_boolean_terms(name)
+    
+    # Búsqueda case-insensitive con LIKE (solo palabras cortas o BD sin el índice)
+    like_query = base_query.format(where="LOWER(s.display_name) LIKE LOWER(%s)")
     search_pattern = f"%{name}%"
-    df = pd.read_sql(query, engine, params=(search_pattern,))
+    
+    def query_mysql():
+        # Un FULLTEXT sin resultados es la respuesta: no se repite con LIKE
+        if fulltext_terms:
+            try:
+                return pd.read_sql(fulltext_query, engine, params=(fulltext_terms, int(limit)))
+            except Exception as e:
+                if not _is_missing_fulltext_index(e):
+                    raise
+                print(f"  ⚠️  Índice FULLTEXT no disponible, usando LIKE: {e}")
+        return pd.read_sql(like_query, engine, params=(search_pattern, int(limit)))
+    
+    df = query_mysql()
     
     # Si no hay resultados en MySQL, buscar en OpenAlex
     if df.empty:
@@ -600,11 +737,10 @@ def search_sources_by_name(name, limit=20):
         
         if sources:
             print(f"  ✓ Encontrados {len(sources)} sources en OpenAlex. Guardando en MySQL...")
-            for source_data in sources:
-                upsert_source_to_mysql(source_data)
+            upsert_sources_to_mysql_batch(sources)
             
             # Volver a consultar MySQL
-            df = pd.read_sql(query, engine, params=(search_pattern,))
+            df = query_mysql()
     
     return df
 
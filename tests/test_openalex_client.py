@@ -0,0 +1,163 @@
+"""
+Tests del cliente de OpenAlex (funciones puras, sin llamadas HTTP).
+"""
+import unittest
+from unittest import mock
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import requests
+
+from etl.openalex_client import (
+    OpenAlexClient, _retry_after_seconds, _is_permanent_error, parse_openalex_date
+)
+
+
+class FakeResponse:
+    """Respuesta mínima con cabeceras y status code."""
+
+    def __init__(self, headers=None, status_code=200):
+        self.headers = headers or {}
+        self.status_code = status_code
+
+
+class FakeHTTPError(Exception):
+    """Excepción con el atributo response de requests."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def make_client():
+    """Cliente sin sesión HTTP (las requests se sustituyen en cada test)."""
+    client = OpenAlexClient.__new__(OpenAlexClient)
+    client.base_url = "https://api.openalex.org"
+    client.email = "test@example.org"
+    return client
+
+
+class TestBuildFulltextQuery(unittest.TestCase):
+    """Paridad de _build_fulltext_query con la implementación original."""
+
+    # Salidas obtenidas con la versión original (bucle sobre la lista de bigramas)
+    CASES = [
+        ("machine", "machine"),
+        ("Machine Learning", "Machine Learning"),
+        ("editorial board diversity gender", '"editorial board" AND (diversity OR gender)'),
+        (
+            "climate change research adaptation policy coastal cities flooding",
+            '"climate change" AND (adaptation OR policy OR coastal OR cities OR flooding)'
+        ),
+        ("deep learning journal study", '"deep learning"'),
+        (
+            "The Editorial Board of Nature journals",
+            '"Editorial Board" AND (The OR of OR Nature OR journals)'
+        ),
+        ("neural networks training", "neural networks training"),
+        ("  Meta   Analysis  oncology  ", '"Meta Analysis" AND (oncology)'),
+        ("alpha beta gamma", "alpha beta gamma"),
+        # Términos genéricos en mayúsculas/minúsculas mezcladas
+        ("Editorial Board JOURNAL Research ethics", '"Editorial Board" AND (ethics)'),
+        ("machine learning STUDY Analysis of Review bias", '"machine learning" AND (of OR bias)'),
+    ]
+
+    def setUp(self):
+        # El método no usa la sesión: se evita crearla
+        self.client = OpenAlexClient.__new__(OpenAlexClient)
+
+    def test_matches_original_output(self):
+        for query_text, expected in self.CASES:
+            with self.subTest(query_text=query_text), mock.patch('builtins.print'):
+                self.assertEqual(self.client._build_fulltext_query(query_text), expected)
+
+
+class TestRetryAfterSeconds(unittest.TestCase):
+
+    def test_missing_header(self):
+        self.assertIsNone(_retry_after_seconds(FakeResponse()))
+
+    def test_seconds(self):
+        self.assertEqual(_retry_after_seconds(FakeResponse({'Retry-After': '7'})), 7.0)
+        self.assertEqual(_retry_after_seconds(FakeResponse({'Retry-After': '1.5'})), 1.5)
+
+    def test_negative_seconds_clamped(self):
+        self.assertEqual(_retry_after_seconds(FakeResponse({'Retry-After': '-3'})), 0.0)
+
+    def test_invalid_value(self):
+        self.assertIsNone(_retry_after_seconds(FakeResponse({'Retry-After': 'pronto'})))
+
+    def test_http_date_in_future(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=120)
+        delay = _retry_after_seconds(FakeResponse({'Retry-After': format_datetime(retry_at, usegmt=True)}))
+        self.assertGreater(delay, 100)
+        self.assertLessEqual(delay, 120)
+
+    def test_http_date_in_past(self):
+        retry_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        delay = _retry_after_seconds(FakeResponse({'Retry-After': format_datetime(retry_at, usegmt=True)}))
+        self.assertEqual(delay, 0.0)
+
+
+class TestIsPermanentError(unittest.TestCase):
+
+    def test_network_error_is_retried(self):
+        self.assertFalse(_is_permanent_error(Exception("timeout")))
+
+    def test_transient_status_is_retried(self):
+        for status_code in (429, 500, 502, 503, 504):
+            with self.subTest(status_code=status_code):
+                self.assertFalse(_is_permanent_error(FakeHTTPError(FakeResponse(status_code=status_code))))
+
+    def test_client_errors_give_up(self):
+        for status_code in (400, 403, 404):
+            with self.subTest(status_code=status_code):
+                self.assertTrue(_is_permanent_error(FakeHTTPError(FakeResponse(status_code=status_code))))
+
+
+class TestSourceLookups(unittest.TestCase):
+
+    def setUp(self):
+        self.client = make_client()
+
+    def test_search_sources_params(self):
+        with mock.patch.object(self.client, '_make_request', return_value={'results': [{'id': 'S1'}]}) as request:
+            results = self.client.search_sources(search_param="Nature", per_page=5)
+
+        self.assertEqual(results, [{'id': 'S1'}])
+        request.assert_called_once_with(
+            "https://api.openalex.org/sources",
+            {'per_page': 5, 'mailto': "test@example.org", 'search': "Nature"}
+        )
+
+    def test_get_source_by_issn_not_found(self):
+        error = requests.exceptions.HTTPError(response=FakeResponse(status_code=404))
+        with mock.patch.object(self.client, '_make_request', side_effect=error) as request:
+            self.assertIsNone(self.client.get_source_by_issn("1234-5678"))
+        self.assertEqual(request.call_args.args[0], "https://api.openalex.org/sources/issn:1234-5678")
+
+    def test_get_source_by_issn_other_errors_propagate(self):
+        error = requests.exceptions.HTTPError(response=FakeResponse(status_code=403))
+        with mock.patch.object(self.client, '_make_request', side_effect=error):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.client.get_source_by_issn("1234-5678")
+
+
+class TestParseOpenalexDate(unittest.TestCase):
+
+    def test_naive_iso_date(self):
+        self.assertEqual(
+            parse_openalex_date('2024-05-01T06:12:34.123456'), datetime(2024, 5, 1, 6, 12, 34, 123456)
+        )
+
+    def test_aware_date_is_converted_to_naive_utc(self):
+        self.assertEqual(parse_openalex_date('2024-05-01T08:00:00+02:00'), datetime(2024, 5, 1, 6, 0))
+
+    def test_invalid_values(self):
+        for value in (None, '', 'ayer'):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_openalex_date(value))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+"""
+Tests del ranker: paridad de las versiones vectorizadas con el cálculo original por fila.
+"""
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from ml import ranker
+
+
+# Pesos de la fórmula original (cada columna normalizada por su máximo)
+REFERENCE_WEIGHTS = (
+    ('freq', 0.75),
+    ('two_yr_mean_citedness', 0.15),
+    ('works_ref_year', 0.05),
+    ('cites_ref_year', 0.05),
+)
+
+
+def reference_explanation(freq, works_ref, cites_ref):
+    """Explicación tal como la generaba la versión original (una fila cada vez)."""
+    if freq == 1:
+        base_text = "Aparece 1 vez en los resultados"
+    else:
+        base_text = f"Aparece {freq} veces en los resultados"
+
+    activity_parts = []
+    if works_ref > 0:
+        activity_parts.append(f"{works_ref} trabajos (año ref)")
+    if cites_ref > 0:
+        activity_parts.append(f"{cites_ref} citas (año ref)")
+
+    if activity_parts:
+        return f"{base_text} | {', '.join(activity_parts)}"
+    return base_text
+
+
+def reference_score(df):
+    """Score original: cada columna normalizada por su máximo (float64)."""
+    score = np.zeros(len(df))
+    for column, weight in REFERENCE_WEIGHTS:
+        values = df[column].astype(float).fillna(0)
+        max_value = values.max()
+        if max_value > 0:
+            score += weight * values / max_value
+    return score
+
+
+def make_sources(source_ids, rng):
+    """Filas de sources como las devuelve fetch_sources."""
+    n = len(source_ids)
+    return pd.DataFrame({
+        'source_id': source_ids,
+        'display_name': [f"Journal {sid}" for sid in source_ids],
+        'works_count': rng.integers(0, 10_000, n),
+        'cited_by_count': rng.integers(0, 100_000, n),
+        'two_yr_mean_citedness': rng.random(n) * 10,
+        'works_ref_year': rng.integers(0, 500, n),
+        'cites_ref_year': rng.integers(0, 5_000, n),
+        'type': 'journal',
+        'publisher': 'Publisher',
+        'country_code': 'ES',
+        'issn_l': '1234-5678',
+        'quartile': 'Q1',
+        'sjr': rng.random(n),
+    }, columns=ranker.SOURCE_COLUMNS).astype(ranker.SOURCE_DTYPES)
+
+
+class TestGenerateExplanations(unittest.TestCase):
+
+    def test_matches_reference(self):
+        values = [0, 1, 2, 37]
+        cases = [(f, w, c) for f in values for w in values for c in values]
+        freq, works_ref, cites_ref = (np.array(col, dtype=np.int64) for col in zip(*cases))
+
+        result = ranker.generate_explanations(freq, works_ref, cites_ref)
+
+        self.assertEqual(result.dtype, object)
+        self.assertEqual(list(result), [reference_explanation(*case) for case in cases])
+
+    def test_empty(self):
+        empty = np.array([], dtype=np.int64)
+        self.assertEqual(len(ranker.generate_explanations(empty, empty, empty)), 0)
+
+
+class TestWeightedScore(unittest.TestCase):
+
+    def test_matches_reference(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'freq': rng.integers(1, 50, 200),
+            'two_yr_mean_citedness': rng.random(200) * 10,
+            'works_ref_year': rng.integers(0, 500, 200),
+            'cites_ref_year': np.zeros(200),  # máximo 0: la columna no aporta
+        })
+
+        score = ranker.weighted_score([
+            (df[column].to_numpy(np.float32), weight) for column, weight in ranker.SCORE_WEIGHTS
+        ])
+
+        self.assertEqual(score.dtype, np.float32)
+        np.testing.assert_allclose(score, reference_score(df), rtol=1e-5, atol=1e-6)
+
+    def test_empty(self):
+        empty = np.array([], dtype=np.float32)
+        score = ranker.weighted_score([(empty, weight) for _, weight in ranker.SCORE_WEIGHTS])
+        self.assertEqual(len(score), 0)
+
+
+class TestFetchSources(unittest.TestCase):
+
+    def setUp(self):
+        ranker._SOURCES_CACHE.clear()
+        self.addCleanup(ranker._SOURCES_CACHE.clear)
+        self.sources = make_sources(["S1", "S2"], np.random.default_rng(3))
+
+    def fetch(self, source_ids):
+        def read_sql(query, engine, params=None, **kwargs):
+            return self.sources[self.sources['source_id'].isin(params['ids'])]
+
+        with mock.patch.object(ranker, 'get_engine', return_value=None), \
+                mock.patch.object(ranker.pd, 'read_sql', side_effect=read_sql) as read:
+            return ranker.fetch_sources(source_ids), read
+
+    def test_cached_rows_skip_mysql(self):
+        self.fetch(["S1", "S2"])
+        df, read = self.fetch(["S2", "S1"])
+
+        read.assert_not_called()
+        self.assertEqual(df['source_id'].tolist(), ["S2", "S1"])
+
+    def test_missing_ids_are_cached(self):
+        df, read = self.fetch(["S1", "S9"])
+        self.assertEqual(read.call_count, 1)
+        self.assertEqual(df['source_id'].tolist(), ["S1"])
+
+        df, read = self.fetch(["S1", "S9"])
+        read.assert_not_called()
+        self.assertEqual(df['source_id'].tolist(), ["S1"])
+
+    def test_invalidate_requeries_missing_id(self):
+        self.fetch(["S9"])
+        ranker.invalidate_sources(["S9"])
+
+        _, read = self.fetch(["S9"])
+        self.assertEqual(read.call_args.kwargs['params'], {'ids': ["S9"]})
+
+
+class TestCalculateScores(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.source_ids = [f"S{i}" for i in range(60)]
+        # Frecuencias distintas: sin empates, el orden es único
+        self.candidates = pd.DataFrame({
+            'source_id': self.source_ids,
+            'freq': rng.permutation(np.arange(1, 61)),
+            'display_name': '',
+        })
+        self.sources = make_sources(self.source_ids[:-5], rng)  # 5 sin fila en MySQL
+
+    def calculate(self, top_n=None):
+        with mock.patch.object(ranker, 'get_engine', return_value=None), \
+                mock.patch.object(ranker, 'fetch_sources', return_value=self.sources.copy()), \
+                mock.patch('builtins.print'):
+            return ranker.calculate_scores(self.candidates.copy(), top_n=top_n)
+
+    def expected(self):
+        df = self.candidates.merge(self.sources, on='source_id', how='left', suffixes=('_original', ''))
+        for column in ('works_ref_year', 'cites_ref_year', 'two_yr_mean_citedness'):
+            df[column] = df[column].astype(float).fillna(0)
+        df['score'] = reference_score(df)
+        df['why'] = [
+            reference_explanation(int(f), int(w), int(c))
+            for f, w, c in zip(df['freq'], df['works_ref_year'], df['cites_ref_year'])
+        ]
+        return df.sort_values('score', ascending=False).reset_index(drop=True)
+
+    def test_matches_reference(self):
+        result = self.calculate()
+        expected = self.expected()
+
+        self.assertEqual(result['source_id'].tolist(), expected['source_id'].tolist())
+        self.assertEqual(result['rank_position'].tolist(), list(range(1, len(expected) + 1)))
+        np.testing.assert_allclose(result['score'], expected['score'], rtol=1e-5, atol=1e-6)
+        self.assertEqual(result['why'].tolist(), expected['why'].tolist())
+
+    def test_top_n_is_prefix_of_full_ranking(self):
+        full = self.calculate()
+        top = self.calculate(top_n=10)
+
+        self.assertEqual(top['source_id'].tolist(), full['source_id'].head(10).tolist())
+        self.assertEqual(top['why'].tolist(), full['why'].head(10).tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+"""
+Tests de similitud: paridad de la caché (matriz normalizada y topics empaquetados)
+con el cálculo original por pares (coseno sobre z-score y Jaccard sobre conjuntos).
+"""
+import json
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from ml import similarity
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def partitions(self):
+        yield self.rows[:7]
+        yield self.rows[7:]
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execution_options(self, **options):
+        return self
+
+    def execute(self, query):
+        return FakeResult(self.rows)
+
+
+class FakeEngine:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def connect(self):
+        return FakeConnection(self.rows)
+
+
+def topics_json(topic_ids):
+    return json.dumps([{'id': f"https://openalex.org/T{tid}"} for tid in topic_ids])
+
+
+def reference_jaccard(set1, set2):
+    """Jaccard por pares tal como se calculaba originalmente."""
+    if not set1 or not set2:
+        return 0.0
+    return len(set1 & set2) / len(set1 | set2)
+
+
+class TestSimilarityCache(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        n = 25
+        self.source_ids = [f"S{i}" for i in range(n)]
+        features = np.column_stack([
+            rng.random(n) * 5,
+            rng.integers(0, 500, n),
+            rng.integers(0, 5_000, n),
+            rng.integers(0, 100_000, n),
+            rng.integers(0, 1_000_000, n),
+        ]).astype(float)
+        features[3, 1] = np.nan  # NULL en MySQL
+        self.raw_features = features
+
+        topic_lists = [list(rng.choice(30, rng.integers(1, 12), replace=False)) for _ in range(n)]
+        topic_lists[5] = []  # revista sin topics
+        self.topic_lists = topic_lists
+
+        topics_values = [topics_json(topics) if topics else None for topics in topic_lists]
+
+        rows = []
+        for sid, feature_row, topics in zip(self.source_ids, features, topics_values):
+            rows.append((sid, *[None if np.isnan(v) else v for v in feature_row], topics))
+
+        with mock.patch.object(similarity.config, 'SIMILARITY_CACHE_DIR', None), \
+                mock.patch('builtins.print'):
+            self.cache = similarity._build_similarity_cache(FakeEngine(rows), 'test')
+        self.cache['positions'] = {sid: pos for pos, sid in enumerate(self.cache['source_ids'])}
+
+    def reference_cosine(self, ref_pos):
+        """Coseno sobre z-score en float64 (NULL como 0, sd 0 como 1)."""
+        x = np.nan_to_num(self.raw_features)
+        sd = x.std(axis=0)
+        sd[sd == 0] = 1
+        z = (x - x.mean(axis=0)) / sd
+        norms = np.linalg.norm(z, axis=1)
+        norms[norms == 0] = 1
+        return (z @ z[ref_pos]) / (norms * norms[ref_pos])
+
+    def find_similar(self, source_id, top_n):
+        def read_sql(query, engine, params=None, **kwargs):
+            return pd.DataFrame({
+                'source_id': params['ids'],
+                'display_name': params['ids'],
+            }).reindex(columns=[
+                'source_id', 'display_name', 'two_yr_mean_citedness', 'works_ref_year',
+                'cites_ref_year', 'works_count', 'cited_by_count', 'type', 'publisher',
+                'country_code', 'issn_l', 'quartile', 'sjr'
+            ])
+
+        with mock.patch.object(similarity, '_load_similarity_cache', return_value=self.cache), \
+                mock.patch.object(similarity, 'get_engine', return_value=None), \
+                mock.patch.object(similarity.pd, 'read_sql', side_effect=read_sql), \
+                mock.patch('builtins.print'):
+            return similarity.find_similar_sources(source_id, top_n=top_n, use_thematic=True)
+
+    def test_features_match_reference_cosine(self):
+        features = np.asarray(self.cache['features'])
+        self.assertEqual(features.dtype, np.float32)
+        self.assertTrue(features.flags['C_CONTIGUOUS'])
+        for ref_pos in (0, 3, 5):
+            with self.subTest(ref_pos=ref_pos):
+                np.testing.assert_allclose(
+                    features @ features[ref_pos], self.reference_cosine(ref_pos), atol=1e-5
+                )
+
+    def test_packed_topics_match_extracted_sets(self):
+        for pos, topics in enumerate(self.topic_lists):
+            length = self.cache['topic_lens'][pos]
+            packed = set(self.cache['topic_matrix'][pos, :length].tolist())
+            self.assertEqual(packed, set(topics[:10]))
+            self.assertTrue((self.cache['topic_matrix'][pos, length:] == -1).all())
+
+    def test_unknown_reference_rechecks_key_before_failing(self):
+        with mock.patch.object(similarity, '_load_similarity_cache', return_value=self.cache) as load, \
+                mock.patch.object(similarity, 'get_engine', return_value=None), \
+                mock.patch('builtins.print'):
+            with self.assertRaises(ValueError):
+                similarity.find_similar_sources("S999")
+
+        self.assertEqual(load.call_args_list, [mock.call(None), mock.call(None, refresh_key=True)])
+
+    def test_thematic_similarity_matches_reference_jaccard(self):
+        for ref_pos in (0, 5, 12):
+            source_id = self.source_ids[ref_pos]
+            with self.subTest(source_id=source_id):
+                result = self.find_similar(source_id, top_n=len(self.source_ids))
+
+                ref_topics = set(self.topic_lists[ref_pos][:10])
+                numeric = self.reference_cosine(ref_pos)
+                expected_thematic = {}
+                expected_final = {}
+                for pos, sid in enumerate(self.source_ids):
+                    if pos == ref_pos:
+                        continue
+                    jaccard = reference_jaccard(ref_topics, set(self.topic_lists[pos][:10]))
+                    expected_thematic[sid] = jaccard
+                    expected_final[sid] = 0.7 * numeric[pos] + 0.3 * jaccard
+
+                self.assertEqual(len(result), len(self.source_ids) - 1)
+                np.testing.assert_allclose(
+                    result['thematic_similarity'].to_numpy(float),
+                    [expected_thematic[sid] for sid in result['source_id']],
+                    atol=1e-9
+                )
+                np.testing.assert_allclose(
+                    result['final_similarity'].to_numpy(float),
+                    [expected_final[sid] for sid in result['source_id']],
+                    atol=1e-5
+                )
+                # Orden descendente por similitud final
+                self.assertTrue((np.diff(result['final_similarity'].to_numpy(float)) <= 1e-6).all())
+
+
+class TestSimilarityCacheKey(unittest.TestCase):
+
+    def setUp(self):
+        similarity.invalidate_similarity_cache_key()
+        self.addCleanup(similarity.invalidate_similarity_cache_key)
+        self.engine = mock.MagicMock()
+        conn = self.engine.connect.return_value.__enter__.return_value
+        conn.execute.return_value.one.return_value = (25, '2024-05-01 06:12:34')
+
+    def test_key_is_memoised(self):
+        first = similarity._similarity_cache_key(self.engine)
+        second = similarity._similarity_cache_key(self.engine)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.engine.connect.call_count, 1)
+
+    def test_refresh_and_invalidate_query_again(self):
+        similarity._similarity_cache_key(self.engine)
+        similarity._similarity_cache_key(self.engine, refresh=True)
+        similarity.invalidate_similarity_cache_key()
+        similarity._similarity_cache_key(self.engine)
+
+        self.assertEqual(self.engine.connect.call_count, 3)
+
+    def test_memo_expires(self):
+        with mock.patch.object(similarity.config, 'SIMILARITY_CACHE_KEY_TTL', 0):
+            similarity._similarity_cache_key(self.engine)
+            similarity._similarity_cache_key(self.engine)
+
+        self.assertEqual(self.engine.connect.call_count, 2)
+
+
+class FakeDBAPIError(Exception):
+    """Error de SQLAlchemy con el error original del driver en .orig."""
+
+    def __init__(self, code):
+        super().__init__(f"({code})")
+        self.orig = Exception(code, "MySQL error")
+
+
+class TestSearchSourcesByName(unittest.TestCase):
+
+    def test_fulltext_boolean_terms(self):
+        self.assertEqual(similarity._fulltext_boolean_terms("Journal of +Ecology"), "+Journal* +Ecology*")
+        self.assertEqual(similarity._fulltext_boolean_terms('"BMJ" (Open)'), "+BMJ* +Open*")
+        self.assertEqual(similarity._fulltext_boolean_terms("AI in ML"), "")
+
+    def search(self, name, read_sql):
+        with mock.patch.object(similarity, 'get_engine', return_value=None), \
+                mock.patch.object(similarity.pd, 'read_sql', side_effect=read_sql) as read, \
+                mock.patch.object(similarity, 'search_openalex_sources', return_value=[]), \
+                mock.patch('builtins.print'):
+            return similarity.search_sources_by_name(name), read
+
+    def test_zero_fulltext_hits_do_not_run_like(self):
+        df, read = self.search("Nature Ecology", [pd.DataFrame()])
+
+        self.assertTrue(df.empty)
+        self.assertEqual(read.call_count, 1)
+        self.assertIn("MATCH(s.display_name)", read.call_args.args[0])
+
+    def test_short_words_use_like(self):
+        _, read = self.search("AI", [pd.DataFrame()])
+
+        self.assertEqual(read.call_count, 1)
+        self.assertIn("LIKE", read.call_args.args[0])
+        self.assertEqual(read.call_args.kwargs['params'], ("%AI%", 20))
+
+    def test_missing_fulltext_index_falls_back_to_like(self):
+        found = pd.DataFrame({'source_id': ["S1"]})
+        df, read = self.search("Nature", [FakeDBAPIError(1191), found])
+
+        self.assertEqual(df['source_id'].tolist(), ["S1"])
+        self.assertIn("LIKE", read.call_args.args[0])
+
+    def test_other_errors_propagate(self):
+        with self.assertRaises(FakeDBAPIError):
+            self.search("Nature", [FakeDBAPIError(2013)])
+
+
+if __name__ == "__main__":
+    unittest.main()
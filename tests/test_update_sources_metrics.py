@@ -0,0 +1,122 @@
+"""
+Tests de la actualización de métricas de sources (sin MySQL ni OpenAlex).
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from etl import update_sources_metrics
+
+
+class FakeConnection:
+    def __init__(self, executed):
+        self.executed = executed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        self.executed.append((str(statement), params))
+
+
+class FakeEngine:
+    def __init__(self):
+        self.executed = []
+
+    def begin(self):
+        return FakeConnection(self.executed)
+
+
+class TestExtractMetrics(unittest.TestCase):
+
+    def test_keeps_openalex_updated_date(self):
+        source_data = {
+            'id': 'https://openalex.org/S1',
+            'updated_date': '2024-05-01T06:12:34.123456',
+            'counts_by_year': [{'year': 2021, 'works_count': 12, 'cited_by_count': 34}],
+            'summary_stats': {'2yr_mean_citedness': 2.5},
+            'works_count': 100,
+            'cited_by_count': 200,
+        }
+
+        params = update_sources_metrics.extract_metrics(source_data, 2021)
+
+        self.assertEqual(params['openalex_updated'], datetime(2024, 5, 1, 6, 12, 34, 123456))
+        self.assertEqual((params['works_ref'], params['cites_ref'], params['two_yr']), (12, 34, 2.5))
+
+    def test_missing_metrics_still_record_the_attempt(self):
+        params = update_sources_metrics.extract_metrics({'updated_date': '2024-05-01T00:00:00'}, 2021)
+
+        self.assertIsNone(params['two_yr'])
+        self.assertIsNone(params['works_ref'])
+        self.assertEqual(params['openalex_updated'], datetime(2024, 5, 1))
+
+
+class TestIsUnchanged(unittest.TestCase):
+
+    def setUp(self):
+        self.remote = datetime(2024, 5, 1, 6, 12, 34, 123456)
+
+    def test_never_attempted_is_refetched(self):
+        self.assertFalse(update_sources_metrics.is_unchanged(None, self.remote))
+
+    def test_unknown_remote_date_is_refetched(self):
+        self.assertFalse(update_sources_metrics.is_unchanged(self.remote, None))
+
+    def test_same_openalex_version_is_skipped(self):
+        self.assertTrue(update_sources_metrics.is_unchanged(self.remote, self.remote))
+
+    def test_newer_openalex_version_is_refetched(self):
+        # Mismo día, pero OpenAlex cambió después de la respuesta usada
+        checked = self.remote - timedelta(hours=1)
+        self.assertFalse(update_sources_metrics.is_unchanged(checked, self.remote))
+
+
+class TestSaveMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.updates = [
+            {'source_id': f"S{i}", 'two_yr': 1.5, 'works_ref': 10, 'cites_ref': 20,
+             'works_count': 100, 'cited_count': 200, 'openalex_updated': datetime(2024, 5, 1, 6, 12, 34)}
+            for i in range(5)
+        ]
+
+    def save(self, batch_size=1000):
+        engine = FakeEngine()
+        with mock.patch.object(update_sources_metrics.config, 'DB_BATCH_SIZE', batch_size), \
+                mock.patch.object(update_sources_metrics, 'invalidate_sources') as invalidate:
+            update_sources_metrics.save_metrics(engine, self.updates)
+        return engine.executed, invalidate
+
+    def test_only_updates_existing_rows(self):
+        executed, _ = self.save()
+
+        self.assertEqual(len(executed), 1)
+        sql, params = executed[0]
+        self.assertIn("UPDATE sources", sql)
+        self.assertIn("WHERE source_id = :source_id", sql)
+        self.assertIn("openalex_updated_date = :openalex_updated", sql)
+        self.assertNotIn("INSERT", sql)
+        self.assertEqual([row['source_id'] for row in params], [u['source_id'] for u in self.updates])
+
+    def test_updated_date_is_one_utc_stamp(self):
+        before = datetime.utcnow()
+        executed, _ = self.save(batch_size=2)
+        after = datetime.utcnow()
+
+        self.assertEqual(len(executed), 3)
+        stamps = {row['updated_date'] for _, params in executed for row in params}
+        self.assertEqual(len(stamps), 1)
+        self.assertTrue(before <= stamps.pop() <= after)
+        self.assertNotIn('updated_date', self.updates[0])
+
+    def test_invalidates_ranker_cache(self):
+        _, invalidate = self.save()
+        self.assertEqual(list(invalidate.call_args.args[0]), [u['source_id'] for u in self.updates])
+
+
+if __name__ == "__main__":
+    unittest.main()